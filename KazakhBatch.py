@@ -0,0 +1,115 @@
+"""Batch helpers behind `inflect_many` and `to_phoneme_many`.
+
+Inputs are cut into chunks and spread over a process pool. Each worker imports the
+module owning the function once, which loads its transducer from the on-disk cache,
+and then serves every chunk it is given. Results come back in input order, and an
+input that fails is reported in its own Result instead of aborting the batch; for
+inputs rejected by validation (see KazakhValidate) the Result also carries the
+position of the problem.
+
+`transduce` is the single-process alternative for large batches: the inputs are
+laid out as one trie, so shared prefixes (stems, tag chains) are matched once, the
+trie is composed with the machine in a single composition and each input's output
+is read back from the resulting lattice.
+"""
+
+import collections
+import importlib
+import itertools
+import multiprocessing
+import os
+from typing import Any, Callable, Iterable, Iterator, NamedTuple, Optional
+
+
+class Result(NamedTuple):
+    input: str
+    output: Any
+    error: Optional[str]
+    position: Optional[int] = None  # Where in `input` validation failed.
+
+
+def apply(func: Callable[[str], Any], word: str) -> Result:
+    try:
+        return Result(word, func(word), None)
+    except Exception as error:
+        return Result(word, None, f"{type(error).__name__}: {error}", getattr(error, "position", None))
+
+
+def trie(words: Iterable[str]):
+    """Returns a deterministic acceptor of `words` over UTF-8 bytes, one state per distinct prefix."""
+    import pynini as pn
+
+    fst = pn.Fst()
+    root = fst.add_state()
+    fst.set_start(root)
+    one = pn.Weight.one(fst.weight_type())
+    children = {}
+    for word in words:
+        state = root
+        for byte in word.encode("utf-8"):
+            following = children.get((state, byte))
+            if following is None:
+                following = children[state, byte] = fst.add_state()
+                fst.add_arc(state, pn.Arc(byte, byte, one, following))
+            state = following
+        fst.set_final(state)
+    return fst
+
+
+def transduce(machine, words: Iterable[str], validate: Optional[Callable[[str], str]] = None,
+              batch_size: int = 1024) -> list[Result]:
+    """Returns the same Results as apply(lambda word: rewrite.top_rewrite(word, machine), word)
+    for every word, in order, composing trie(batch) with `machine` once per `batch_size`
+    words. Words that `validate` rejects are reported without entering the trie. The
+    machine must give each input at most one output, as the grammars' cascades do."""
+    import pynini as pn
+
+    results = []
+    for batch in _chunks(words, batch_size):
+        rejected = {}
+        for word in batch if validate is not None else ():
+            result = apply(validate, word)
+            if result.error is not None:
+                rejected[word] = result
+        lattice = pn.compose(trie(word for word in batch if word not in rejected), machine)
+        outputs = {}
+        for word, output, _ in lattice.paths().items():
+            outputs.setdefault(word, output)
+        for word in batch:
+            if word in rejected:
+                results.append(rejected[word])
+            elif word in outputs:
+                results.append(Result(word, outputs[word], None))
+            else:
+                results.append(Result(word, None, "Error: Composition failure"))
+    return results
+
+
+def _apply_chunk(func: Callable[[str], Any], words: list[str]) -> list[Result]:
+    return [apply(func, word) for word in words]
+
+
+def _chunks(words: Iterable[str], size: int) -> Iterator[list[str]]:
+    words = iter(words)
+    while chunk := list(itertools.islice(words, size)):
+        yield chunk
+
+
+def imap(func: Callable[[str], Any], words: Iterable[str],
+         processes: Optional[int] = None, chunksize: int = 256) -> Iterator[Result]:
+    """Yields apply(func, word) for every word, in input order. At most two chunks per
+    worker are in flight at once, so `words` may be an arbitrarily long iterator."""
+    processes = processes or os.cpu_count() or 1
+    if processes == 1:
+        for word in words:
+            yield apply(func, word)
+        return
+    with multiprocessing.Pool(processes, initializer=importlib.import_module,
+                              initargs=(getattr(func, "func", func).__module__,)) as pool:
+        pending = collections.deque()
+        for chunk in _chunks(words, chunksize):
+            pending.append(pool.apply_async(_apply_chunk, (func, chunk)))
+            if len(pending) >= 2 * processes:
+                yield from pending.popleft().get()
+        while pending:
+            yield from pending.popleft().get()
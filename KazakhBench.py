@@ -0,0 +1,321 @@
+"""Benchmarks for the Kazakh transducers.
+
+    python -m KazakhBench [suite ...] [--save results.json] [--compare baseline.json]
+
+Suites (all of them by default):
+
+  compile     cold import time and peak RSS of each module in a fresh interpreter,
+              once compiling the grammar (cache off) and once reading the FAR cache
+  latency     p50/p99 per-call latency of `inflect` and `to_phoneme`, memo bypassed
+  throughput  words per second on a synthetic corpus, memo bypassed
+  size        state and arc counts of the compiled machines
+  analyze     single-token analysis latency, checked against ANALYZE_TARGET_MS
+  batch       words per second of the trie-batched inflect_batch/to_phoneme_batch
+              against the per-word loop, for each of --batch-sizes
+  workers     per-worker RSS and PSS of a pool of --workers fresh processes, each
+              holding its own Pynini machines or mapping the shared KazakhTables
+
+The synthetic corpus is drawn with a fixed seed from the morphology's own alphabet
+(`v`, `c`) and tag categories, so it follows the grammar when the grammar changes.
+Results are printed as JSON; with --compare every metric is checked against a saved
+run and the exit status is non-zero if any got worse by more than --tolerance.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import resource
+import subprocess
+import sys
+import time
+from typing import Callable, Iterable
+
+STEMS = ("bala", "kirpi", "sóz", "adam", "mektep", "qazaq", "kól", "saıt", "qala", "shymkent")
+
+# Per-token latency targets for analyze(), in milliseconds.
+ANALYZE_TARGET_MS = {"p50_ms": 1.0, "p99_ms": 5.0}
+
+# Metrics where a larger value is an improvement; every other metric should not grow.
+HIGHER_IS_BETTER = ("words_per_second", "loop_words_per_second", "speedup")
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def percentile(samples: list[float], q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))]
+
+
+def latency(func: Callable[[str], object], words: Iterable[str], repeat: int = 1) -> dict[str, float]:
+    """Calls `func` once per word, `repeat` times over, and summarizes the per-call latency."""
+    samples = []
+    for _ in range(repeat):
+        for word in words:
+            start = time.perf_counter()
+            func(word)
+            samples.append((time.perf_counter() - start) * 1000)
+    return {"calls": len(samples), "p50_ms": percentile(samples, 50), "p99_ms": percentile(samples, 99)}
+
+
+def throughput(func: Callable[[str], object], words: list[str]) -> dict[str, float]:
+    start = time.perf_counter()
+    for word in words:
+        try:
+            func(word)
+        except Exception:
+            pass
+    return {"words": len(words), "words_per_second": len(words) / (time.perf_counter() - start)}
+
+
+def synthetic_corpus(size: int, seed: int = 0) -> list[str]:
+    """Random CV(C) stems from the grammar's alphabet, each with a random valid tag sequence."""
+    import KazakhMorphology
+
+    vowels = [vowel for vowel, _, _ in KazakhMorphology._machines["v"].paths().items()]
+    consonants = [consonant for consonant, _, _ in KazakhMorphology._machines["c"].paths().items()]
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(size):
+        stem = "".join(rng.choice(consonants) + rng.choice(vowels) for _ in range(rng.randint(1, 3)))
+        if rng.random() < 0.5:
+            stem += rng.choice(consonants)
+        tags = "".join(rng.choice(("",) + KazakhMorphology.CATEGORIES[category])
+                       for category in KazakhMorphology.NOMINAL)
+        corpus.append(stem + tags)
+    return corpus
+
+
+def _surfaces(tagged: list[str]) -> list[str]:
+    import KazakhMorphology
+
+    surfaces = []
+    for word in tagged:
+        try:
+            surfaces.append(KazakhMorphology.inflect.__wrapped__(word))
+        except Exception:
+            pass
+    return surfaces
+
+
+def bench_compile() -> dict[str, dict[str, float]]:
+    probe = ("import json, resource, sys, time; start = time.perf_counter(); import {module}; "
+             "print(json.dumps({{'seconds': time.perf_counter() - start, "
+             "'peak_rss_kib': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss}}))")
+    results = {}
+    for module in ("KazakhMorphology", "KazakhG2P"):
+        for label, cache in (("compile", "0"), ("cached", "1")):
+            env = dict(os.environ, KAZAKH_FST_CACHE=cache)
+            if cache == "1":
+                # Make sure the archive exists, so the timed run only reads it.
+                subprocess.run([sys.executable, "-c", f"import {module}"], cwd=_HERE, env=env, check=True)
+            output = subprocess.run([sys.executable, "-c", probe.format(module=module)], cwd=_HERE, env=env,
+                                    check=True, capture_output=True, text=True).stdout
+            results[f"{module}.{label}"] = json.loads(output)
+    return results
+
+
+def bench_latency(corpus: list[str], repeat: int = 1) -> dict[str, dict[str, float]]:
+    import KazakhG2P
+    import KazakhMorphology
+
+    tagged = [word for word in corpus if _ok(KazakhMorphology.inflect.__wrapped__, word)]
+    surfaces = [word for word in _surfaces(tagged) if _ok(KazakhG2P.to_phoneme.__wrapped__, word)]
+    return {
+        "inflect": latency(KazakhMorphology.inflect.__wrapped__, tagged, repeat),
+        "to_phoneme": latency(KazakhG2P.to_phoneme.__wrapped__, surfaces, repeat),
+    }
+
+
+def bench_throughput(corpus: list[str]) -> dict[str, dict[str, float]]:
+    import KazakhG2P
+    import KazakhMorphology
+
+    return {
+        "inflect": throughput(KazakhMorphology.inflect.__wrapped__, corpus),
+        "to_phoneme": throughput(KazakhG2P.to_phoneme.__wrapped__, _surfaces(corpus)),
+    }
+
+
+def bench_size() -> dict[str, dict[str, float]]:
+    import KazakhBuild
+    import KazakhG2P
+    import KazakhMorphology
+
+    return {name: {"states": fst.num_states(), "arcs": KazakhBuild.num_arcs(fst)}
+            for name, fst in (("morph", KazakhMorphology.morph), ("g2p", KazakhG2P.g2p))}
+
+
+def bench_analyze(repeat: int = 3) -> dict[str, dict[str, float]]:
+    import KazakhMorphology
+
+    forms = sorted({surface for stem in STEMS for surface in KazakhMorphology.paradigm(stem).values()})
+    stems = KazakhMorphology.lexicon(STEMS)
+    KazakhMorphology.analyzer()
+    return {
+        "analyze": latency(KazakhMorphology.analyze, forms, repeat),
+        "analyze_lexicon": latency(lambda word: KazakhMorphology.analyze(word, stems), forms, repeat),
+    }
+
+
+def bench_batch(sizes: Iterable[int] = (16, 64, 256, 1024, 4096)) -> dict[str, dict[str, float]]:
+    """Runs one batch of each size through the trie-batched path and through the per-word
+    API (memo bypassed) and compares their throughput."""
+    import KazakhBatch
+    import KazakhG2P
+    import KazakhMorphology
+
+    sizes = sorted(sizes)
+    corpus = synthetic_corpus(sizes[-1], seed=1)
+    surfaces = _surfaces(corpus)
+    results = {}
+    for name, words, batched, single in (
+            ("inflect", corpus, KazakhMorphology.inflect_batch, KazakhMorphology.inflect.__wrapped__),
+            ("to_phoneme", surfaces, KazakhG2P.to_phoneme_batch, KazakhG2P.to_phoneme.__wrapped__)):
+        throughput(single, words[:sizes[0]])  # Compiles the sub-cascades the loop uses.
+        for size in sizes:
+            batch = words[:size]
+            start = time.perf_counter()
+            batched(batch, batch_size=size)
+            trie_seconds = time.perf_counter() - start
+            start = time.perf_counter()
+            for word in batch:
+                KazakhBatch.apply(single, word)
+            loop_seconds = time.perf_counter() - start
+            results[f"{name}.{size}"] = {"words": len(batch), "words_per_second": len(batch) / trie_seconds,
+                                         "loop_words_per_second": len(batch) / loop_seconds,
+                                         "speedup": loop_seconds / trie_seconds}
+    return results
+
+
+def _memory_kib() -> dict[str, int]:
+    """RSS and PSS of this process; PSS charges each shared page to its sharers in equal parts."""
+    usage = {}
+    try:
+        with open("/proc/self/smaps_rollup") as rollup:
+            for line in rollup:
+                if line.startswith(("Rss:", "Pss:")):
+                    usage[line[:3].lower() + "_kib"] = int(line.split()[1])
+    except OSError:
+        usage["rss_kib"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return usage
+
+
+def _load_backend(backend: str) -> None:
+    if backend == "tables":
+        import KazakhTables
+
+        KazakhTables.machine("morph")
+        KazakhTables.machine("g2p")
+    else:
+        import KazakhG2P  # noqa: F401
+        import KazakhMorphology  # noqa: F401
+
+
+def _worker_memory(backend: str, words: list[str]) -> dict[str, int]:
+    import importlib
+
+    module = importlib.import_module("KazakhTables" if backend == "tables" else "KazakhMorphology")
+    for word in words:
+        _ok(module.inflect, word)
+    return dict(_memory_kib(), pid=os.getpid())
+
+
+def bench_workers(corpus: list[str], workers: int = 4) -> dict[str, dict[str, float]]:
+    """Starts `workers` fresh processes per backend (spawned, so nothing is inherited
+    copy-on-write), runs `corpus` through each and reports their mean and total memory."""
+    results = {}
+    context = multiprocessing.get_context("spawn")
+    for backend in ("pynini", "tables"):
+        if backend == "tables":
+            import KazakhTables
+
+            KazakhTables.prepare()
+        with context.Pool(workers, initializer=_load_backend, initargs=(backend,)) as pool:
+            # A barrier of one task per worker: every worker has loaded and answered before any reports.
+            reports = {}
+            while len(reports) < workers:
+                for report in pool.starmap(_worker_memory, [(backend, corpus)] * workers, chunksize=1):
+                    reports[report.pop("pid")] = report
+        stats = {"workers": len(reports)}
+        for metric in ("rss_kib", "pss_kib"):
+            values = [report[metric] for report in reports.values() if metric in report]
+            if values:
+                stats[f"mean_{metric}"] = sum(values) / len(values)
+                stats[f"total_{metric}"] = sum(values)
+        results[backend] = stats
+    return results
+
+
+def missed_targets(results: dict[str, dict[str, float]], targets: dict[str, float]) -> list[str]:
+    return [f"{name} {metric} {stats[metric]:.3f} > {limit}"
+            for name, stats in results.items()
+            for metric, limit in targets.items() if stats[metric] > limit]
+
+
+def regressions(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Lists every metric in both runs that got worse than the baseline by more than `tolerance` (a fraction)."""
+    found = []
+    for suite, benchmarks in results.items():
+        for name, stats in benchmarks.items():
+            for metric, value in stats.items():
+                before = baseline.get(suite, {}).get(name, {}).get(metric)
+                if not before or metric in ("calls", "words", "workers"):
+                    continue
+                change = (value - before) / before
+                if metric in HIGHER_IS_BETTER:
+                    change = -change
+                if change > tolerance:
+                    found.append(f"{suite}/{name}/{metric}: {before:.4g} -> {value:.4g} ({change:+.0%})")
+    return found
+
+
+def _ok(func: Callable[[str], object], word: str) -> bool:
+    try:
+        func(word)
+        return True
+    except Exception:
+        return False
+
+
+if __name__ == "__main__":
+    suites = ("compile", "latency", "throughput", "size", "analyze", "batch", "workers")
+    parser = argparse.ArgumentParser(description="Benchmark the Kazakh transducers.")
+    parser.add_argument("suite", nargs="*", help=f"any of {', '.join(suites)} (default: all)")
+    parser.add_argument("--corpus-size", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[16, 64, 256, 1024, 4096])
+    parser.add_argument("--workers", type=int, default=4, help="pool size for the workers suite")
+    parser.add_argument("--save", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="baseline JSON file written by --save")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown/growth (default 20%%)")
+    args = parser.parse_args()
+    args.suite = args.suite or suites
+    if set(args.suite) - set(suites):
+        parser.error(f"unknown suite: {', '.join(sorted(set(args.suite) - set(suites)))}")
+
+    corpus = synthetic_corpus(args.corpus_size) if {"latency", "throughput", "workers"} & set(args.suite) else []
+    runners = {
+        "compile": bench_compile,
+        "latency": lambda: bench_latency(corpus, args.repeat),
+        "throughput": lambda: bench_throughput(corpus),
+        "size": bench_size,
+        "analyze": lambda: bench_analyze(args.repeat),
+        "batch": lambda: bench_batch(args.batch_sizes),
+        "workers": lambda: bench_workers(corpus[:200], args.workers),
+    }
+    results = {suite: runners[suite]() for suite in args.suite}
+    results["process"] = {"bench": {"peak_rss_kib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss}}
+    print(json.dumps(results, indent=2))
+    if args.save:
+        with open(args.save, "w") as output:
+            json.dump(results, output, indent=2)
+
+    failures = missed_targets(results.get("analyze", {}), ANALYZE_TARGET_MS)
+    if args.compare:
+        with open(args.compare) as baseline:
+            failures += regressions(results, json.load(baseline), args.tolerance)
+    for line in failures:
+        print(f"regression: {line}", file=sys.stderr)
+    sys.exit(1 if failures else 0)
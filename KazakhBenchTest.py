@@ -0,0 +1,26 @@
+"""Simple Tester for the benchmark helpers.
+"""
+
+from absl.testing import absltest
+import KazakhBench
+import KazakhMorphology
+
+
+class KazakhBenchTest(absltest.TestCase):
+    def testSyntheticCorpusIsReproducible(self):
+        corpus = KazakhBench.synthetic_corpus(50, seed=1)
+        self.assertEqual(corpus, KazakhBench.synthetic_corpus(50, seed=1))
+        self.assertTrue(any(KazakhBench._ok(KazakhMorphology.inflect, word) for word in corpus))
+
+    def testRegressions(self):
+        baseline = {"latency": {"inflect": {"p50_ms": 1.0, "calls": 10}},
+                    "throughput": {"inflect": {"words_per_second": 100.0}}}
+        results = {"latency": {"inflect": {"p50_ms": 1.1, "calls": 99}},
+                   "throughput": {"inflect": {"words_per_second": 50.0}}}
+        found = KazakhBench.regressions(results, baseline, tolerance=0.2)
+        self.assertLen(found, 1)
+        self.assertStartsWith(found[0], "throughput/inflect/words_per_second")
+
+
+if __name__ == '__main__':
+    absltest.main()
@@ -0,0 +1,249 @@
+"""Instrumented build of the rule modules (KazakhMorphologyRules, KazakhG2PRules).
+
+The module source is executed one top-level statement at a time. For every
+transducer a statement defines (rules such as `plr1`, groups such as `plural`, and
+the final machines) the report records its number of states and arcs, how long the
+statement took and how much the resident set grew while it ran. A trailing
+`x.optimize()` statement is charged to `x`.
+
+In optimized mode every group (an assignment composing named machines with `@`, such
+as `plural = plr1 @ ... @ plr6` or `rules = ...`) is optimized as soon as it is
+built: epsilon removal, determinization where the machine allows it (transducers are
+determinized over encoded labels) and minimization, which is what `Fst.optimize`
+does. The final machines are optimized in both modes by the rule modules themselves.
+
+For incremental rebuilds every name a module assigns gets a content key (see `keys`):
+a hash of the statements that define it and of the keys of the names they use, so
+it changes exactly when the definition or anything it depends on does. The rule
+groups of the cascade are the units of reuse. Given a `store` of compiled units,
+`build` loads each unit whose key is already stored instead of compiling it and its
+rules, compiles only the others, and recomposes the final machines.
+
+    python -m KazakhBuild KazakhMorphologyRules [--optimize] [--json]
+"""
+
+import argparse
+import ast
+import hashlib
+import json
+import os
+import resource
+import time
+from typing import Iterable, NamedTuple, Optional, Protocol
+
+import pynini as pn
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+class Entry(NamedTuple):
+    name: str
+    kind: str  # "group" for `@` compositions of named machines, "fst" otherwise.
+    states: int
+    arcs: int
+    seconds: float
+    rss_bytes: int
+
+
+def num_arcs(fst: pn.Fst) -> int:
+    return sum(fst.num_arcs(state) for state in fst.states())
+
+
+def rss_bytes() -> int:
+    """Current resident set size; falls back to the peak where /proc is unavailable."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def is_group(value: ast.expr) -> bool:
+    """True for `a @ b @ ...` where every operand is a plain name."""
+    if isinstance(value, ast.BinOp) and isinstance(value.op, ast.MatMult):
+        return all(isinstance(side, ast.Name) or is_group(side) for side in (value.left, value.right))
+    return False
+
+
+def operands(value: ast.expr) -> list[str]:
+    """The names composed by a group expression, left to right."""
+    if isinstance(value, ast.Name):
+        return [value.id]
+    return operands(value.left) + operands(value.right)
+
+
+def cascade(module: str, final: str = "rules") -> list[tuple[str, list[str]]]:
+    """Returns the groups composed into `final` in rule module `module`, in order, each
+    with its rules in order. A rule composed directly into `final` is its own group;
+    when `final` only composes rules (as in KazakhG2PRules) they form one group."""
+    groups = {}
+    for statement in _parse(module)[1].body:
+        name = _assigned_name(statement)
+        if name is not None and is_group(statement.value):
+            groups[name] = operands(statement.value)
+    members = groups[final]
+    if not any(member in groups for member in members):
+        return [(final, members)]
+    return [(member, groups.get(member, [member])) for member in members]
+
+
+class Store(Protocol):
+    """Compiled units by name and content key (KazakhCache.UnitStore is the on-disk one)."""
+
+    def get(self, name: str, key: str) -> Optional[pn.Fst]: ...
+
+    def put(self, name: str, key: str, fst: pn.Fst) -> None: ...
+
+
+def keys(module: str) -> dict[str, str]:
+    """Returns the content key of every name rule module `module` defines. Formatting and
+    comments do not affect the keys; names imported from another project module are
+    keyed by that module's source."""
+    path, tree = _parse(module)
+    found = {}
+    for statement in tree.body:
+        defined = _defined_names(statement)
+        if not defined:
+            continue
+        digest = hashlib.sha256(ast.dump(statement).encode())
+        for name in sorted(_used_names(statement) & set(found)):
+            digest.update(f"{name}={found[name]}".encode())
+        if isinstance(statement, ast.ImportFrom) and statement.module:
+            source = os.path.join(_HERE, statement.module + ".py")
+            if os.path.exists(source):
+                with open(source, "rb") as imported:
+                    digest.update(imported.read())
+        for name in defined:
+            found[name] = digest.hexdigest()[:16]
+    return found
+
+
+def units(module: str) -> list[str]:
+    """The rule groups of `module`'s cascade, which are compiled and stored one by one."""
+    try:
+        return [group for group, _ in cascade(module)]
+    except KeyError:
+        # No `rules` cascade (e.g. KazakhPronounceRules): nothing to reuse.
+        return []
+
+
+def build(module: str, optimize: bool = False, names: Optional[Iterable[str]] = None,
+          store: Optional[Store] = None) -> tuple[dict, list[Entry]]:
+    """Executes rule module `module` statement by statement. Returns its namespace and
+    one Entry per transducer it compiles, in definition order.
+
+    With `names`, only the statements those names depend on are executed. With `store`,
+    every unit whose key is in the store is loaded from it rather than compiled, and
+    every unit that is compiled is added to it."""
+    path, tree = _parse(module)
+    namespace = {"__name__": module, "__file__": path}
+    entries = {}
+    key = keys(module) if store is not None else {}
+    reusable = units(module) if store is not None else []
+    loaded = {unit: store.get(unit, key[unit]) for unit in reusable}
+    loaded = {unit: fst for unit, fst in loaded.items() if fst is not None}
+    needed = _needed(tree, names, loaded)
+    for statement in tree.body:
+        defined = _defined_names(statement)
+        if defined and not defined & needed:
+            continue
+        if defined & set(loaded):
+            namespace.update((name, loaded[name]) for name in defined)
+            continue
+        code = compile(ast.Module([statement], type_ignores=[]), path, "exec")
+        rss = rss_bytes()
+        start = time.perf_counter()
+        exec(code, namespace)
+        name = _assigned_name(statement)
+        group = name is not None and is_group(statement.value)
+        if group and optimize:
+            namespace[name].optimize()
+        seconds = time.perf_counter() - start
+        grown = rss_bytes() - rss
+        if name is None:
+            name = _optimized_name(statement)
+            if name in entries:
+                previous = entries[name]
+                seconds += previous.seconds
+                grown += previous.rss_bytes
+                group = previous.kind == "group"
+        if name is not None and isinstance(namespace.get(name), pn.Fst):
+            fst = namespace[name]
+            entries[name] = Entry(name, "group" if group else "fst", fst.num_states(), num_arcs(fst),
+                                  seconds, grown)
+    for unit in reusable:
+        if unit in entries:
+            store.put(unit, key[unit], namespace[unit])
+    return namespace, list(entries.values())
+
+
+def _needed(tree: ast.Module, names: Optional[Iterable[str]], loaded: dict) -> set[str]:
+    """The names whose statements have to run to define `names` (everything when None).
+    A `loaded` unit needs none of the names it is built from."""
+    statements = [(_defined_names(statement), statement) for statement in tree.body]
+    if names is None:
+        return set().union(*(defined for defined, _ in statements))
+    needed = set(names)
+    for defined, statement in reversed(statements):
+        if defined & needed and not defined & set(loaded):
+            needed |= _used_names(statement)
+    return needed
+
+
+def _parse(module: str) -> tuple[str, ast.Module]:
+    path = os.path.join(_HERE, module + ".py")
+    with open(path, encoding="utf-8") as source:
+        return path, ast.parse(source.read(), path)
+
+
+def _assigned_name(statement: ast.stmt):
+    if (isinstance(statement, ast.Assign) and len(statement.targets) == 1
+            and isinstance(statement.targets[0], ast.Name)):
+        return statement.targets[0].id
+    return None
+
+
+def _defined_names(statement: ast.stmt) -> set[str]:
+    """The names a top-level statement assigns, imports or (for `x.optimize()`) updates."""
+    if isinstance(statement, (ast.Import, ast.ImportFrom)):
+        return {(alias.asname or alias.name).split(".")[0] for alias in statement.names}
+    name = _assigned_name(statement) or _optimized_name(statement)
+    return {name} if name else set()
+
+
+def _used_names(statement: ast.stmt) -> set[str]:
+    return {node.id for node in ast.walk(statement) if isinstance(node, ast.Name)}
+
+
+def _optimized_name(statement: ast.stmt):
+    # Matches the `morph.optimize()` statements that follow some definitions.
+    if (isinstance(statement, ast.Expr) and isinstance(statement.value, ast.Call)
+            and isinstance(statement.value.func, ast.Attribute)
+            and statement.value.func.attr == "optimize"
+            and isinstance(statement.value.func.value, ast.Name)):
+        return statement.value.func.value.id
+    return None
+
+
+def format_report(entries: list[Entry]) -> str:
+    lines = [f"{'name':<14} {'kind':<6} {'states':>8} {'arcs':>9} {'seconds':>9} {'rss KiB':>9}"]
+    for entry in entries:
+        lines.append(f"{entry.name:<14} {entry.kind:<6} {entry.states:>8} {entry.arcs:>9} "
+                     f"{entry.seconds:>9.4f} {entry.rss_bytes // 1024:>9}")
+    total = sum(entry.seconds for entry in entries)
+    lines.append(f"{'total':<14} {'':<6} {'':>8} {'':>9} {total:>9.4f} {rss_bytes() // 1024:>9}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build a rule module and report per-rule statistics.")
+    parser.add_argument("module", choices=["KazakhMorphologyRules", "KazakhG2PRules"])
+    parser.add_argument("--optimize", action="store_true", help="optimize every group as it is built")
+    parser.add_argument("--json", action="store_true", help="print one JSON object per transducer")
+    args = parser.parse_args()
+    _, report = build(args.module, args.optimize)
+    if args.json:
+        for entry in report:
+            print(json.dumps(entry._asdict()))
+    else:
+        print(format_report(report))
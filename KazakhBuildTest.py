@@ -0,0 +1,55 @@
+"""Simple Tester for the instrumented rule-module build.
+"""
+
+from absl.testing import absltest
+from pynini.lib import rewrite
+import KazakhBuild
+
+
+class KazakhBuildTest(absltest.TestCase):
+    def testReport(self):
+        _, report = KazakhBuild.build("KazakhG2PRules")
+        entries = {entry.name: entry for entry in report}
+        self.assertEqual(entries["r1"].kind, "fst")
+        self.assertEqual(entries["rules"].kind, "group")
+        self.assertGreater(entries["g2p"].arcs, 0)
+        self.assertIn("g2p", KazakhBuild.format_report(report))
+
+    def testOptimizedGroupsAreNoLarger(self):
+        plain, plain_report = KazakhBuild.build("KazakhMorphologyRules")
+        optimized, optimized_report = KazakhBuild.build("KazakhMorphologyRules", optimize=True)
+        plain_states = {entry.name: entry.states for entry in plain_report if entry.kind == "group"}
+        for entry in optimized_report:
+            if entry.kind == "group":
+                self.assertLessEqual(entry.states, plain_states[entry.name], entry.name)
+        for word in ["bala+PLR+2PLR-POSS", "kirpi+3-POSS+ABL", "shymkent+ACC", "mektep+INS"]:
+            self.assertEqual(rewrite.top_rewrite(word, optimized["morph"]),
+                             rewrite.top_rewrite(word, plain["morph"]))
+
+    def testStoredUnitsAreReused(self):
+        class Store(dict):
+            def get(self, name, key):
+                return super().get((name, key))
+
+            def put(self, name, key, fst):
+                self[name, key] = fst
+
+        store = Store()
+        first, first_report = KazakhBuild.build("KazakhMorphologyRules", optimize=True, names=["morph"], store=store)
+        self.assertLen(store, len(KazakhBuild.units("KazakhMorphologyRules")))
+        second, second_report = KazakhBuild.build("KazakhMorphologyRules", optimize=True, names=["morph"],
+                                                  store=store)
+        self.assertIn("dat1", {entry.name for entry in first_report})
+        self.assertNotIn("dat1", {entry.name for entry in second_report})
+        self.assertNotIn("dat", {entry.name for entry in second_report})
+        for word in ["bala+PLR+1PLR-POSS+DAT", "kirpi+3-POSS+ABL", "jazý+PAST-PTCP"]:
+            self.assertEqual(rewrite.top_rewrite(word, second["morph"]), rewrite.top_rewrite(word, first["morph"]))
+
+    def testKeysFollowDependencies(self):
+        keys = KazakhBuild.keys("KazakhMorphologyRules")
+        self.assertNotEqual(keys["dat"], keys["acc"])
+        self.assertEqual(keys, KazakhBuild.keys("KazakhMorphologyRules"))
+
+
+if __name__ == '__main__':
+    absltest.main()
@@ -0,0 +1,194 @@
+"""On-disk cache of the compiled Kazakh transducers.
+
+Compiling the rule modules (KazakhMorphologyRules, KazakhG2PRules, ...) takes a few
+seconds, so the machines they export are written to a FAR archive the first time
+they are built and read back on every later import. Archives are keyed by a hash
+of the rule module's source, the sources of the project modules it imports and the
+Pynini version, so editing a rule or upgrading Pynini makes the old archive stale
+and it is rebuilt on the next import. Callers that load different sets of machines
+from one module (KazakhMorphology and KazakhTrace) each get an archive of their own. Misses are built through KazakhBuild in
+optimized mode, so every rule group is optimized too.
+
+Each rule group (`plural`, `poss`, `dat`, ...) is also kept on its own under
+units/, keyed by KazakhBuild's content key for it, which covers its rules and the
+symbol classes they use. A miss only compiles the groups whose definitions changed
+and recomposes the cascade from the rest, so editing one rule rebuilds one group.
+
+The cache lives in ~/.cache/kazakh-fst unless KAZAKH_FST_CACHE_DIR is set, and
+KAZAKH_FST_CACHE=0 turns it off. To prebuild it at deploy time run:
+
+    python -m KazakhCache [--rebuild]
+"""
+
+import argparse
+import ast
+import glob
+import hashlib
+import os
+import tempfile
+from typing import Optional
+
+import pynini as pn
+
+import KazakhBuild
+
+CACHE_DIR = os.environ.get("KAZAKH_FST_CACHE_DIR",
+                           os.path.join(os.path.expanduser("~"), ".cache", "kazakh-fst"))
+ENABLED = os.environ.get("KAZAKH_FST_CACHE", "1") != "0"
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def dependencies(module: str) -> list[str]:
+    """Returns `module` followed by every module of this project it imports, directly or not."""
+    found = [module]
+    for name in found:
+        with open(os.path.join(_HERE, name + ".py"), encoding="utf-8") as source:
+            tree = ast.parse(source.read())
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                imported = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and node.module:
+                imported = [node.module]
+            else:
+                continue
+            for candidate in imported:
+                if candidate not in found and os.path.exists(os.path.join(_HERE, candidate + ".py")):
+                    found.append(candidate)
+    return found
+
+
+def source_fingerprint(module: str) -> str:
+    """Hashes the source of `module` and of the project modules it imports, the Pynini
+    version and the build mode."""
+    digest = hashlib.sha256()
+    for dependency in dependencies(module):
+        with open(os.path.join(_HERE, dependency + ".py"), "rb") as source:
+            digest.update(source.read())
+    digest.update(pn.__version__.encode())
+    digest.update(b"optimized")
+    return digest.hexdigest()[:16]
+
+
+def names_fingerprint(names: list[str]) -> str:
+    return hashlib.sha256(" ".join(sorted(names)).encode()).hexdigest()[:8]
+
+
+def fingerprint(module: str, names: list[str]) -> str:
+    """Hashes everything an archive of `names` from `module` depends on: the sources
+    (see source_fingerprint) and the exported names."""
+    return hashlib.sha256(f"{source_fingerprint(module)} {names_fingerprint(names)}".encode()).hexdigest()[:16]
+
+
+def far_path(module: str, names: list[str]) -> str:
+    """The archive of `names` from `module`. The source and name hashes are separate
+    parts of the file name, so archives of different name sets (KazakhMorphology's and
+    KazakhTrace's, say) live side by side and only a source change makes one stale."""
+    return os.path.join(CACHE_DIR, f"{module}-{source_fingerprint(module)}-{names_fingerprint(names)}.far")
+
+
+def load(module: str, names: list[str], rebuild: bool = False) -> dict[str, pn.Fst]:
+    """Returns the machines `names` exported by rule module `module`. The module is
+    only compiled when there is no up-to-date archive."""
+    names = sorted(names)
+    path = far_path(module, names)
+    if ENABLED and not rebuild and os.path.exists(path):
+        fsts = _read(path)
+        if fsts is not None and sorted(fsts) == names:
+            return fsts
+    grammar, _ = KazakhBuild.build(module, optimize=True, names=names,
+                                   store=UnitStore(module, rebuild) if ENABLED else None)
+    fsts = {name: grammar[name] for name in names}
+    if ENABLED:
+        _write(path, fsts)
+    return fsts
+
+
+def clear() -> None:
+    """Removes every cached archive and unit."""
+    for path in glob.glob(os.path.join(CACHE_DIR, "*.far")) + glob.glob(os.path.join(CACHE_DIR, "units", "*.fst")):
+        os.remove(path)
+
+
+class UnitStore:
+    """Compiled rule groups of one module, one file per group, named by its content key
+    (and the Pynini version). Only the latest version of each group is kept."""
+
+    def __init__(self, module: str, rebuild: bool = False):
+        self.module = module
+        self.rebuild = rebuild
+        self.directory = os.path.join(CACHE_DIR, "units")
+
+    def path(self, name: str, key: str) -> str:
+        digest = hashlib.sha256(f"{key} {pn.__version__}".encode()).hexdigest()[:16]
+        return os.path.join(self.directory, f"{self.module}.{name}-{digest}.fst")
+
+    def get(self, name: str, key: str) -> Optional[pn.Fst]:
+        path = self.path(name, key)
+        if self.rebuild or not os.path.exists(path):
+            return None
+        try:
+            return pn.Fst.read(path)
+        except OSError:
+            return None
+
+    def put(self, name: str, key: str, fst: pn.Fst) -> None:
+        path = self.path(name, key)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            os.close(fd)
+            fst.write(tmp)
+            os.chmod(tmp, 0o644)
+            os.replace(tmp, path)
+            for stale in glob.glob(os.path.join(self.directory, f"{self.module}.{name}-*.fst")):
+                if stale != path:
+                    os.remove(stale)
+        except OSError:
+            pass
+
+
+def _read(path: str):
+    try:
+        return {name: fst.copy() for name, fst in pn.Far(path, mode="r")}
+    except OSError:
+        # Unreadable or truncated archive: treat it as a miss and rebuild.
+        return None
+
+
+def _write(path: str, fsts: dict[str, pn.Fst]) -> None:
+    module, source, _ = os.path.basename(path)[:-len(".far")].split("-")
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=CACHE_DIR, suffix=".tmp")
+        os.close(fd)
+        far = pn.Far(tmp, mode="w")
+        # STTable archives require keys in sorted order.
+        for name in sorted(fsts):
+            far[name] = fsts[name]
+        far.close()
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+        # Archives of other name sets built from the same sources stay; any other archive of the module is stale.
+        for stale in glob.glob(os.path.join(CACHE_DIR, f"{module}-*.far")):
+            if not os.path.basename(stale).startswith(f"{module}-{source}-"):
+                os.remove(stale)
+    except OSError:
+        # A read-only or full cache directory only costs us the speedup.
+        pass
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Prebuild the compiled transducer cache.")
+    parser.add_argument("--rebuild", action="store_true", help="discard existing archives first")
+    args = parser.parse_args()
+    if args.rebuild:
+        clear()
+    import KazakhCyrillic
+    import KazakhG2P
+    import KazakhMorphology
+    import KazakhPronounce
+    import KazakhTrace
+    for grammar in KazakhTrace.GRAMMARS:
+        KazakhTrace.rules(grammar)
+    print(CACHE_DIR)
@@ -0,0 +1,61 @@
+"""Simple Tester for the on-disk cache of compiled transducers.
+"""
+
+import os
+import tempfile
+
+from absl.testing import absltest
+from pynini.lib import rewrite
+import KazakhBuild
+import KazakhCache
+
+
+class KazakhCacheTest(absltest.TestCase):
+    def setUp(self):
+        super().setUp()
+        self.enter_context(absltest.mock.patch.object(KazakhCache, "CACHE_DIR", tempfile.mkdtemp()))
+        self.enter_context(absltest.mock.patch.object(KazakhCache, "ENABLED", True))
+
+    def testRoundTrip(self):
+        built = KazakhCache.load("KazakhG2PRules", ["g2p"])["g2p"]
+        path = KazakhCache.far_path("KazakhG2PRules", ["g2p"])
+        self.assertTrue(os.path.exists(path))
+        loaded = KazakhCache.load("KazakhG2PRules", ["g2p"])["g2p"]
+        self.assertEqual(loaded.num_states(), built.num_states())
+        self.assertEqual(rewrite.top_rewrite("qazaqstan", loaded), "qχazaqstan")
+
+    def testStaleArchiveIsReplaced(self):
+        stale = os.path.join(KazakhCache.CACHE_DIR, "KazakhG2PRules-0000000000000000.far")
+        with open(stale, "wb") as far:
+            far.write(b"stale")
+        KazakhCache.load("KazakhG2PRules", ["g2p"])
+        self.assertFalse(os.path.exists(stale))
+
+    def testNameSetsKeepTheirOwnArchives(self):
+        # KazakhG2P and KazakhTrace load the same rule module with different names; neither evicts the other.
+        rules = [rule for _, members in KazakhBuild.cascade("KazakhG2PRules") for rule in members]
+        for names in (["g2p", "grapheme"], rules, ["g2p", "grapheme"]):
+            KazakhCache.load("KazakhG2PRules", names)
+        self.assertTrue(os.path.exists(KazakhCache.far_path("KazakhG2PRules", ["g2p", "grapheme"])))
+        self.assertTrue(os.path.exists(KazakhCache.far_path("KazakhG2PRules", rules)))
+        self.assertLen(os.listdir(KazakhCache.CACHE_DIR), 3)  # Both archives and the units directory.
+
+    def testCorruptArchiveIsRebuilt(self):
+        path = KazakhCache.far_path("KazakhG2PRules", ["g2p"])
+        with open(path, "wb") as far:
+            far.write(b"corrupt")
+        g2p = KazakhCache.load("KazakhG2PRules", ["g2p"])["g2p"]
+        self.assertEqual(rewrite.top_rewrite("kitap", g2p), "kɪtap")
+
+    def testUnitsSurviveArchiveLoss(self):
+        KazakhCache.load("KazakhG2PRules", ["g2p"])
+        units = os.listdir(os.path.join(KazakhCache.CACHE_DIR, "units"))
+        self.assertLen(units, 1)
+        self.assertStartsWith(units[0], "KazakhG2PRules.rules-")
+        os.remove(KazakhCache.far_path("KazakhG2PRules", ["g2p"]))
+        g2p = KazakhCache.load("KazakhG2PRules", ["g2p"])["g2p"]
+        self.assertEqual(rewrite.top_rewrite("qazaqstan", g2p), "qχazaqstan")
+
+
+if __name__ == '__main__':
+    absltest.main()
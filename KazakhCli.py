@@ -0,0 +1,70 @@
+"""Streaming command-line front end shared by `python -m KazakhMorphology` and
+`python -m KazakhG2P`.
+
+Input is read one word per line from a file or stdin and each result is written to
+stdout as soon as its chunk is done, so memory use does not depend on input size.
+Output is TSV (`input<TAB>output`) or JSONL (`{"input", "output", "error"}`). Lines
+that fail are flagged in the output by default (TSV rows get an empty output column
+and the error in a third column), or can be skipped or made to stop the run. With
+`--backend tables` the workers share one memory-mapped copy of the machine (see
+KazakhTables) instead of each holding its own.
+"""
+
+import argparse
+import json
+import sys
+from typing import Callable, Optional
+
+import KazakhBatch
+
+
+def main(func: Callable[[str], str], description: str, argv: Optional[list[str]] = None,
+         stdin=None, stdout=None, tables: Optional[Callable[[str], str]] = None) -> int:
+    """Runs the CLI over `func`. `tables` is the KazakhTables equivalent of `func`,
+    selected with --backend tables."""
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("input", nargs="?", default="-", help="file with one word per line (default: stdin)")
+    parser.add_argument("--format", choices=["tsv", "jsonl"], default="tsv")
+    parser.add_argument("--errors", choices=["flag", "skip", "fail"], default="flag",
+                        help="what to do with lines that cannot be processed")
+    parser.add_argument("--processes", type=int, default=1, help="worker processes (0: one per core)")
+    parser.add_argument("--chunksize", type=int, default=256, help="lines per worker task")
+    if tables is not None:
+        parser.add_argument("--backend", choices=["pynini", "tables"], default="pynini",
+                            help="tables: serve from memory-mapped transition tables shared by all workers")
+    args = parser.parse_args(argv)
+    if getattr(args, "backend", "pynini") == "tables":
+        import KazakhTables
+
+        # Export stale tables once, here, instead of in every worker at the same time.
+        KazakhTables.prepare()
+        func = tables
+    stdin = stdin or sys.stdin
+    stdout = stdout or sys.stdout
+
+    source = stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    try:
+        words = (line.rstrip("\r\n") for line in source)
+        for result in KazakhBatch.imap(func, words, args.processes or None, args.chunksize):
+            if result.error is not None:
+                if args.errors == "skip":
+                    continue
+                if args.errors == "fail":
+                    print(f"error: {result.input!r}: {result.error}", file=sys.stderr)
+                    return 1
+            stdout.write(_format(result, args.format) + "\n")
+    except BrokenPipeError:
+        # Downstream closed early (e.g. `| head`); nothing left to report.
+        sys.stderr.close()
+    finally:
+        if source is not stdin:
+            source.close()
+    return 0
+
+
+def _format(result: KazakhBatch.Result, output_format: str) -> str:
+    if output_format == "jsonl":
+        return json.dumps(result._asdict(), ensure_ascii=False)
+    if result.error is not None:
+        return f"{result.input}\t\t{result.error}"
+    return f"{result.input}\t{result.output}"
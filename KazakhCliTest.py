@@ -0,0 +1,46 @@
+"""Simple Tester for the streaming command-line front end.
+"""
+
+import io
+import json
+
+from absl.testing import absltest
+import KazakhCli
+import KazakhMorphology
+
+
+class KazakhCliTest(absltest.TestCase):
+    def run_cli(self, lines: str, *argv: str, tables=None) -> tuple[int, str]:
+        stdout = io.StringIO()
+        status = KazakhCli.main(KazakhMorphology.inflect, "test", list(argv), io.StringIO(lines), stdout,
+                                tables=tables)
+        return status, stdout.getvalue()
+
+    def testTsvFlagsErrors(self):
+        status, output = self.run_cli("bala+PLR\nqala!\nsóz+DAT\n")
+        rows = [line.split("\t") for line in output.splitlines()]
+        self.assertEqual(status, 0)
+        self.assertEqual(rows[0], ["bala+PLR", "balalar"])
+        self.assertEqual(rows[1][:2], ["qala!", ""])
+        self.assertEqual(rows[2], ["sóz+DAT", "sózge"])
+
+    def testJsonlSkipsErrorsInParallel(self):
+        status, output = self.run_cli("bala+PLR\nqala!\nsóz+DAT\n", "--format", "jsonl", "--errors", "skip",
+                                      "--processes", "2", "--chunksize", "1")
+        self.assertEqual(status, 0)
+        self.assertEqual([json.loads(line)["output"] for line in output.splitlines()], ["balalar", "sózge"])
+
+    def testFailStops(self):
+        status, output = self.run_cli("bala+PLR\nqala!\nsóz+DAT\n", "--errors", "fail")
+        self.assertEqual(status, 1)
+        self.assertEqual(output, "bala+PLR\tbalalar\n")
+
+    def testBackendSelectsTables(self):
+        _, output = self.run_cli("bala+PLR\n", tables=str.upper)
+        self.assertEqual(output, "bala+PLR\tbalalar\n")
+        _, output = self.run_cli("bala+PLR\n", "--backend", "tables", tables=str.upper)
+        self.assertEqual(output, "bala+PLR\tBALA+PLR\n")
+
+
+if __name__ == '__main__':
+    absltest.main()
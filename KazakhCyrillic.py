@@ -0,0 +1,74 @@
+"""Cyrillic input for the G2P and morphology machines, and script detection.
+
+`to_phoneme` and `inflect` here take Cyrillic Kazakh ("уақыт", "бала+PLR") and run
+it through machines that have the transliteration (see KazakhCyrillicRules)
+composed in front of `g2p` and `morph`, so there is no separate transliteration
+pass. `detect_script` tells the two scripts apart, and `to_phoneme_auto` and
+`inflect_auto` send each word to the machine for its script.
+"""
+
+from typing import Iterable, Optional
+
+from pynini.lib import rewrite
+
+import KazakhBatch
+import KazakhCache
+import KazakhG2P
+import KazakhMemo
+import KazakhMorphology
+import KazakhValidate
+
+_machines = KazakhCache.load("KazakhCyrillicRules", ["letter", "cyrillic", "cyrillic_g2p", "cyrillic_morph"])
+cyrillic = _machines["cyrillic"]
+cyrillic_g2p = _machines["cyrillic_g2p"]
+cyrillic_morph = _machines["cyrillic_morph"]
+
+# Cyrillic letter -> Latin spelling, both cases.
+LETTERS = {letter: latin for letter, latin, _ in _machines["letter"].paths().items()}
+
+# Letters whose Latin spelling the morphology accepts; "ү" (ú), for one, is not in its alphabet.
+validate = KazakhValidate.Validator(
+    [letter for letter, latin in LETTERS.items() if KazakhMorphology.validate.check(latin) is None],
+    KazakhMorphology.TAG_SLOTS)
+validate_graphemes = KazakhValidate.Validator(
+    letter for letter, latin in LETTERS.items() if KazakhG2P.validate.check(latin) is None)
+
+
+def detect_script(word: str) -> str:
+    """Returns "cyrillic" if `word` contains a Cyrillic letter and "latin" otherwise."""
+    return "cyrillic" if any("Ѐ" <= char <= "ӿ" for char in word) else "latin"
+
+
+@KazakhMemo.lru_cache()
+def transliterate(word: str) -> str:
+    return rewrite.top_rewrite(validate_graphemes(word), cyrillic)
+
+
+@KazakhMemo.lru_cache()
+def to_phoneme(word: str) -> str:
+    return rewrite.top_rewrite(validate_graphemes(word), cyrillic_g2p)
+
+
+@KazakhMemo.lru_cache()
+def inflect(word: str) -> str:
+    return rewrite.top_rewrite(validate(word), cyrillic_morph)
+
+
+def to_phoneme_auto(word: str) -> str:
+    return to_phoneme(word) if detect_script(word) == "cyrillic" else KazakhG2P.to_phoneme(word)
+
+
+def inflect_auto(word: str) -> str:
+    return inflect(word) if detect_script(word) == "cyrillic" else KazakhMorphology.inflect(word)
+
+
+def to_phoneme_many(words: Iterable[str], processes: Optional[int] = None,
+                    chunksize: int = 256) -> list[KazakhBatch.Result]:
+    """Runs `to_phoneme_auto` over `words`, which may mix both scripts, on a pool of workers."""
+    return list(KazakhBatch.imap(to_phoneme_auto, words, processes, chunksize))
+
+
+def inflect_many(words: Iterable[str], processes: Optional[int] = None,
+                 chunksize: int = 256) -> list[KazakhBatch.Result]:
+    """Runs `inflect_auto` over `words`, which may mix both scripts, on a pool of workers."""
+    return list(KazakhBatch.imap(inflect_auto, words, processes, chunksize))
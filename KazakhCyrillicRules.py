@@ -0,0 +1,49 @@
+"""Transliteration of Cyrillic Kazakh into the Latin script used by the other
+grammars, composed in front of `g2p` and `morph` so that Cyrillic input takes a
+single lookup.
+
+Every Cyrillic letter has one Latin spelling, whatever its neighbours, because the
+Latin alphabet spells these letters the same way in every position and leaves their
+pronunciation in context to `g2p`:
+
+    и, й     both ı. The alphabet has one letter for the vowel-like и ([ɪj], [ɯj])
+             and the glide й; which one is heard follows from the neighbouring letters.
+    у        always ý, whether it follows a vowel (тау taý) or starts a word or
+             syllable (уақыт ýaqyt); Kazakh у is a [w] glide in both.
+    е        always e; the [je] onset of a word-initial е is not written.
+    ё, ю, я  ıo, ıý, ıa in every position, the glide spelled out as ı.
+    ъ, ь     dropped; they only occur in Russian loans and have no Latin letter.
+
+Some letters spell as several Latin characters (ш sh, ч ch, щ shch, ц ts, ё ıo,
+ю ıý, я ıa), so the machine is a closure over a string map rather than a
+one-to-one relabelling. Capitals are folded to
+lower case, which is all the Latin grammars accept. The tag characters pass through
+unchanged, so "бала+PLR" is a valid morphology input.
+
+Reference:
+K. Gorman & R. Sproat. 2021. Finite-State Text Processing . Morgan & Claypool.
+"""
+
+import pynini as pn
+
+from KazakhG2PRules import g2p
+from KazakhMorphologyRules import morph, tag
+
+# Cyrillic letter -> Latin spelling
+LETTERS = (
+    ("а", "a"), ("ә", "á"), ("б", "b"), ("в", "v"), ("г", "g"), ("ғ", "ǵ"),
+    ("д", "d"), ("е", "e"), ("ё", "ıo"), ("ж", "j"), ("з", "z"), ("и", "ı"),
+    ("й", "ı"), ("к", "k"), ("қ", "q"), ("л", "l"), ("м", "m"), ("н", "n"),
+    ("ң", "ń"), ("о", "o"), ("ө", "ó"), ("п", "p"), ("р", "r"), ("с", "s"),
+    ("т", "t"), ("у", "ý"), ("ұ", "u"), ("ү", "ú"), ("ф", "f"), ("х", "x"),
+    ("һ", "h"), ("ц", "ts"), ("ч", "ch"), ("ш", "sh"), ("щ", "shch"), ("ъ", ""),
+    ("ы", "y"), ("і", "i"), ("ь", ""), ("э", "e"), ("ю", "ıý"), ("я", "ıa"),
+)
+
+letter = pn.string_map(LETTERS + tuple((cyrillic.upper(), latin) for cyrillic, latin in LETTERS)).optimize()
+cyrillic = pn.closure(letter).optimize()
+
+cyrillic_g2p = cyrillic @ g2p
+cyrillic_g2p.optimize()
+cyrillic_morph = pn.closure(letter | tag) @ morph
+cyrillic_morph.optimize()
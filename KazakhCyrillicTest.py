@@ -0,0 +1,45 @@
+"""Simple Tester for Cyrillic input and script detection.
+"""
+
+from absl.testing import absltest
+import KazakhCyrillic
+import KazakhG2P
+import KazakhValidate
+
+
+class KazakhCyrillicTest(absltest.TestCase):
+    def testTransliterate(self):
+        self.assertEqual(KazakhCyrillic.transliterate("Қазақстан"), "qazaqstan")
+        self.assertEqual(KazakhCyrillic.transliterate("шай"), "shaı")
+        self.assertEqual(KazakhCyrillic.transliterate("уақыт"), "ýaqyt")
+
+    def testContextFreeLetters(self):
+        # Word-initial е, vowel and consonant у, vowel and glide и/й: one spelling each, pronounced by g2p
+        for cyrillic, latin in [("ел", "el"), ("бел", "bel"), ("тау", "taý"), ("уақыт", "ýaqyt"), ("су", "sý"),
+                                ("ине", "ıne"), ("ми", "mı"), ("сый", "syı"), ("ай", "aı")]:
+            self.assertEqual(KazakhCyrillic.transliterate(cyrillic), latin, cyrillic)
+        for cyrillic in ["ел", "тау", "уақыт", "ине", "ми", "сый"]:
+            self.assertEqual(KazakhCyrillic.to_phoneme(cyrillic),
+                             KazakhG2P.to_phoneme(KazakhCyrillic.transliterate(cyrillic)), cyrillic)
+
+    def testToPhoneme(self):
+        for cyrillic in ["сенің", "біреу", "осылай", "өте", "балаларымызға"]:
+            self.assertEqual(KazakhCyrillic.to_phoneme(cyrillic),
+                             KazakhG2P.to_phoneme(KazakhCyrillic.transliterate(cyrillic)), cyrillic)
+
+    def testInflect(self):
+        self.assertEqual(KazakhCyrillic.inflect("бала+PLR+1PLR-POSS+DAT"), "balalarymyzǵa")
+        self.assertEqual(KazakhCyrillic.inflect("сөз+DAT"), "sózge")
+        with self.assertRaises(KazakhValidate.UnknownTag):
+            KazakhCyrillic.inflect("қала+FOO")
+
+    def testAutoDetection(self):
+        self.assertEqual(KazakhCyrillic.detect_script("бала+PLR"), "cyrillic")
+        self.assertEqual(KazakhCyrillic.detect_script("bala+PLR"), "latin")
+        results = KazakhCyrillic.inflect_many(["бала+PLR", "bala+PLR"], processes=1)
+        self.assertEqual([result.output for result in results], ["balalar", "balalar"])
+        self.assertEqual(KazakhCyrillic.to_phoneme_auto("қазақстан"), KazakhCyrillic.to_phoneme_auto("qazaqstan"))
+
+
+if __name__ == '__main__':
+    absltest.main()
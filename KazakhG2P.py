@@ -7,61 +7,54 @@ Reference:
 K. Gorman & R. Sproat. 2021. Finite-State Text Processing . Morgan & Claypool.
 """
 
-import pynini as pn
+
+import importlib
+from typing import Iterable, Optional
+
 from pynini.lib import rewrite
 
-# Kazakh alphabet
-grapheme = pn.union(
-    "a", "o", "u", "y", "á", "e", "i", "ó",
-    "ú", "ý", "b", "d", "g", "f", "ǵ", "h",
-    "ı", "j", "k", "l", "m", "n", "ń", "p",
-    "q", "r", "s", "t", "v", "x", "z", "sh", "ch"
-)
-# Kazakh phoneme inventory
-phoneme = pn.union(
-    "a", "æ", "b", "d", "e", "f", "g", "ɣ", "h",
-    "ɪ", "j", "k", "l", "m", "n", "ŋ", "o", "œ",
-    "p", "q", "ɾ", "s", "ʃ", "t", "tɕ", "u", "v",
-    "χ", "y", "z", "ʒ", "ɯ", "w", "uw", "yw", "ɣʷ", "ɜʷ"
-)
-
-sigma_star = pn.union(grapheme, phoneme).closure().optimize()
-
-# Vowel classes -> used to modify /ý/ for vowel harmony
-back_vowel = pn.union("a", "o", "u", "y")
-front_vowel = pn.union("á", "e", "i", "ó", "ú")
-
-# g2p rewrite
-gp = pn.cdrewrite(pn.string_map([
-    ("y", "ɯ"),
-    ("á", "æ"),
-    ("i", "ɪ"),
-    ("ó", "œ"),
-    ("ú", "y"),
-    ("ǵ", "ɣ"),
-    ("ı", "j"),
-    ("j", "ʒ"),
-    ("ń", "ŋ"),
-    ("r", "ɾ"),
-    ("x", "χ"),
-    ("sh", "ʃ"),
-    ("ch", "tɕ")
-    ]),
-    "", "",
-    sigma_star).optimize()
-
-# Other rules (non-comprehensive)
-r1 = pn.cdrewrite(pn.cross("ý", "uw"), back_vowel + sigma_star, "", sigma_star).optimize()
-r2 = pn.cdrewrite(pn.cross("ý", "yw"), front_vowel + sigma_star, "", sigma_star).optimize()
-r3 = pn.cdrewrite(pn.cross("ý", "w"), "[BOS]", "", sigma_star).optimize()
-r4 = pn.cdrewrite(pn.cross("q", "qχ"), "[BOS]", "", sigma_star).optimize()
-r5 = pn.cdrewrite(pn.cross("o", "ɣʷ"), "[BOS]", "", sigma_star).optimize()
-r6 = pn.cdrewrite(pn.cross("œ", "ɜʷ"), "[BOS]", "", sigma_star).optimize()
-
-rules = gp @ r1 @ r2 @ r3 @ r4 @ r5 @ r6
-g2p = pn.closure(grapheme) @ rules @ pn.closure(phoneme)
-g2p.optimize()
+import KazakhBatch
+import KazakhCache
+import KazakhMemo
+import KazakhValidate
 
+# The rules themselves are in KazakhG2PRules; only the compiled cascade is loaded here.
+_machines = KazakhCache.load("KazakhG2PRules", ["g2p", "grapheme"])
+g2p = _machines["g2p"]
+validate = KazakhValidate.Validator(grapheme for grapheme, _, _ in _machines["grapheme"].paths().items())
 
+
+@KazakhMemo.lru_cache()
 def to_phoneme(word: str) -> str:
-    return rewrite.top_rewrite(word, g2p)
+    return rewrite.top_rewrite(validate(word), g2p)
+
+
+def to_phoneme_many(words: Iterable[str], processes: Optional[int] = None,
+                    chunksize: int = 256) -> list[KazakhBatch.Result]:
+    """Runs `to_phoneme` over `words` on a pool of `processes` workers (all cores by default).
+    Results are in input order; failures are reported per word in `Result.error`."""
+    return list(KazakhBatch.imap(to_phoneme, words, processes, chunksize))
+
+
+def to_phoneme_batch(words: Iterable[str], batch_size: int = 1024) -> list[KazakhBatch.Result]:
+    """Like `to_phoneme_many`, but in this process and without a composition per word: every
+    `batch_size` words go through `g2p` in one composition of their trie (see KazakhBatch.transduce)."""
+    return KazakhBatch.transduce(g2p, words, validate, batch_size)
+
+
+def __getattr__(name: str):
+    # Individual rules and symbol classes (`gp`, `grapheme`, ...) are compiled on first access.
+    if name.startswith("__"):
+        raise AttributeError(name)
+    return getattr(importlib.import_module("KazakhG2PRules"), name)
+
+
+if __name__ == "__main__":
+    import sys
+
+    import KazakhCli
+    import KazakhTables
+    import KazakhG2P
+
+    sys.exit(KazakhCli.main(KazakhG2P.to_phoneme, "Convert Kazakh words to IPA, one per line.",
+                            tables=KazakhTables.to_phoneme))
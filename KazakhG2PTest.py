@@ -21,6 +21,16 @@ class KazakhG2PTest(absltest.TestCase):
         self.assertPron("osylaı", "ɣʷsɯlaj")
         self.assertPron("balalarymyzǵa", "balalaɾɯmɯzɣa")
 
+    def testToPhonemeMany(self):
+        results = KazakhG2P.to_phoneme_many(["kitap", "bala+PLR", "qaldym"], processes=2, chunksize=1)
+        self.assertEqual([result.output for result in results], ["kɪtap", None, "qχaldɯm"])
+        self.assertIsNotNone(results[1].error)
+
+    def testToPhonemeBatch(self):
+        results = KazakhG2P.to_phoneme_batch(["kitap", "bala+PLR", "qaldym", "kitap"])
+        self.assertEqual([result.output for result in results], ["kɪtap", None, "qχaldɯm", "kɪtap"])
+        self.assertIsNotNone(results[1].error)
+
 
 if __name__ == '__main__':
     absltest.main()
@@ -0,0 +1,169 @@
+"""Precomputed full-form lexicon: every inflection and pronunciation of a closed list
+of lemmas, looked up from a memory-mapped table instead of the transducers.
+
+    python -m KazakhLexicon LEMMAS OUT [--processes N]
+
+runs every lemma in file LEMMAS (one per line) through `paradigm` for all nominal
+and verbal tag sequences and every resulting form through `to_phoneme`, and writes
+two sorted tables to OUT: tagged form -> surface form and surface form -> IPA.
+`Lexicon(OUT)` maps the file read-only and answers `inflect` and `to_phoneme` by
+binary search, which needs only the standard library; words that are not in the
+table fall back to KazakhMorphology / KazakhG2P, which are only imported on the
+first miss. `Lexicon.metrics()` reports the hit rate and the lookup latency.
+
+File layout (little-endian):
+    magic b"KZLX", version, num_inflections, num_pronunciations  4 x uint32
+    then for each of the two tables, in that order:
+        offsets[count + 1]  uint32, record start within the records
+        records             b"key\\0value" per entry, sorted by key, padded to 4 bytes
+"""
+
+import argparse
+import array
+import collections
+import importlib
+import mmap
+import os
+import struct
+import sys
+import time
+from typing import Iterable, Optional
+
+import KazakhBatch
+
+MAGIC = b"KZLX"
+VERSION = 1
+_HEADER = struct.Struct("<4sIII")
+
+
+def entries(lemma: str) -> list[tuple[str, str]]:
+    """Every (tagged form, surface form) of `lemma` that the grammar generates."""
+    import KazakhMorphology
+
+    forms = KazakhMorphology.paradigm(lemma, KazakhMorphology.NOMINAL)
+    forms.update(KazakhMorphology.paradigm(lemma, KazakhMorphology.VERBAL))
+    return sorted(forms.items())
+
+
+def build(lemmas: Iterable[str], path: str, processes: Optional[int] = 1) -> tuple[int, int]:
+    """Writes the lexicon of `lemmas` to `path`; returns the sizes of its two tables."""
+    import KazakhG2P
+
+    inflections = {}
+    for result in KazakhBatch.imap(entries, lemmas, processes, chunksize=16):
+        if result.error is None:
+            inflections.update(result.output)
+    pronunciations = {result.input: result.output
+                      for result in KazakhG2P.to_phoneme_batch(sorted(set(inflections.values())))
+                      if result.error is None}
+    tables = [_table(inflections), _table(pronunciations)]
+    with open(path + ".tmp", "wb") as out:
+        out.write(_HEADER.pack(MAGIC, VERSION, len(inflections), len(pronunciations)))
+        for offsets, records in tables:
+            if sys.byteorder != "little":
+                offsets.byteswap()
+            out.write(offsets.tobytes())
+            out.write(records)
+    os.replace(path + ".tmp", path)
+    return len(inflections), len(pronunciations)
+
+
+def _table(mapping: dict[str, str]) -> tuple[array.array, bytes]:
+    offsets = array.array("I")
+    records = bytearray()
+    for key, value in sorted((key.encode("utf-8"), value.encode("utf-8")) for key, value in mapping.items()):
+        offsets.append(len(records))
+        records += key + b"\0" + value
+    offsets.append(len(records))
+    records += bytes(-len(records) % 4)
+    return offsets, bytes(records)
+
+
+class _Table:
+    def __init__(self, view: memoryview, position: int, count: int):
+        self.offsets = view[position:position + 4 * (count + 1)].cast("I")
+        position += 4 * (count + 1)
+        self.records = view[position:position + self.offsets[count]]
+        self.end = position + self.offsets[count] + (-self.offsets[count] % 4)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def get(self, word: str) -> Optional[str]:
+        key = word.encode("utf-8") + b"\0"
+        low, high = 0, len(self)
+        while low < high:
+            middle = (low + high) // 2
+            record = self.records[self.offsets[middle]:self.offsets[middle + 1]].tobytes()
+            if record.startswith(key):
+                return record[len(key):].decode("utf-8")
+            if record < key:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+
+class Lexicon:
+    """A lexicon file mapped read-only. With `fallback`, words missing from it go through
+    the transducers; otherwise they raise KeyError."""
+
+    def __init__(self, path: str, fallback: bool = True):
+        with open(path, "rb") as table:
+            self._map = mmap.mmap(table.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, num_inflections, num_pronunciations = _HEADER.unpack_from(self._map)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} lexicon")
+        view = memoryview(self._map)
+        self.inflections = _Table(view, _HEADER.size, num_inflections)
+        self.pronunciations = _Table(view, self.inflections.end, num_pronunciations)
+        self.fallback = fallback
+        self.hits = self.misses = 0
+        self.latencies_us = collections.deque(maxlen=10000)
+
+    def inflect(self, word: str) -> str:
+        return self._lookup(self.inflections, word, "KazakhMorphology", "inflect")
+
+    def to_phoneme(self, word: str) -> str:
+        return self._lookup(self.pronunciations, word, "KazakhG2P", "to_phoneme")
+
+    def _lookup(self, table: _Table, word: str, module: str, name: str) -> str:
+        start = time.perf_counter()
+        output = table.get(word)
+        self.latencies_us.append((time.perf_counter() - start) * 1e6)
+        if output is not None:
+            self.hits += 1
+            return output
+        self.misses += 1
+        if not self.fallback:
+            raise KeyError(word)
+        return getattr(importlib.import_module(module), name)(word)
+
+    def metrics(self) -> dict:
+        latencies = sorted(self.latencies_us)
+
+        def percentile(q):
+            return latencies[min(len(latencies) - 1, int(q / 100 * len(latencies)))] if latencies else None
+
+        lookups = self.hits + self.misses
+        return {
+            "inflections": len(self.inflections),
+            "pronunciations": len(self.pronunciations),
+            "lookups": lookups,
+            "hits": self.hits,
+            "hit_rate": self.hits / lookups if lookups else None,
+            "lookup_p50_us": percentile(50),
+            "lookup_p99_us": percentile(99),
+        }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build a full-form lexicon from a lemma list.")
+    parser.add_argument("lemmas", help="file with one lemma per line")
+    parser.add_argument("output")
+    parser.add_argument("--processes", type=int, default=1, help="worker processes (0: one per core)")
+    args = parser.parse_args()
+    with open(args.lemmas, encoding="utf-8") as lines:
+        lemmas = [line.strip() for line in lines if line.strip()]
+    inflections, pronunciations = build(lemmas, args.output, args.processes or None)
+    print(f"{args.output}: {inflections} inflections, {pronunciations} pronunciations")
@@ -0,0 +1,40 @@
+"""Simple Tester for the precomputed full-form lexicon.
+"""
+
+import os
+
+from absl.testing import absltest
+import KazakhG2P
+import KazakhLexicon
+import KazakhMorphology
+
+
+class KazakhLexiconTest(absltest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.path = os.path.join(absltest.get_default_test_tmpdir(), "lexicon.kzlx")
+        cls.sizes = KazakhLexicon.build(["bala", "sóz", "mektep"], cls.path)
+
+    def testLookupMatchesTransducers(self):
+        lexicon = KazakhLexicon.Lexicon(self.path, fallback=False)
+        self.assertEqual(self.sizes, (len(lexicon.inflections), len(lexicon.pronunciations)))
+        for tagged in ["bala+PLR+1PLR-POSS+DAT", "sóz+DAT", "mektep+PLR+1SING-POSS", "bala"]:
+            surface = lexicon.inflect(tagged)
+            self.assertEqual(surface, KazakhMorphology.inflect(tagged))
+            self.assertEqual(lexicon.to_phoneme(surface), KazakhG2P.to_phoneme(surface))
+        with self.assertRaises(KeyError):
+            lexicon.inflect("kitap+PLR")
+
+    def testFallbackAndMetrics(self):
+        lexicon = KazakhLexicon.Lexicon(self.path)
+        self.assertEqual(lexicon.inflect("bala+PLR"), "balalar")
+        self.assertEqual(lexicon.inflect("kitap+PLR"), "kitaptar")
+        metrics = lexicon.metrics()
+        self.assertEqual(metrics["lookups"], 2)
+        self.assertEqual(metrics["hit_rate"], 0.5)
+        self.assertIsNotNone(metrics["lookup_p50_us"])
+
+
+if __name__ == '__main__':
+    absltest.main()
@@ -0,0 +1,91 @@
+"""Bounded LRU memoization for `inflect` and `to_phoneme`.
+
+Word frequencies in running text follow Zipf's law, so a few thousand forms make up
+most calls. A hit returns the stored output without touching Pynini. Unlike
+functools.lru_cache the cache can be resized in place and also counts evictions.
+The default bound is 4096 entries per function, or KAZAKH_FST_MEMO_SIZE if set.
+"""
+
+import collections
+import functools
+import os
+import threading
+from typing import Callable, NamedTuple
+
+DEFAULT_MAXSIZE = int(os.environ.get("KAZAKH_FST_MEMO_SIZE", "4096"))
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    maxsize: int
+    currsize: int
+
+
+class LRUCache:
+    def __init__(self, maxsize: int):
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self.maxsize = maxsize
+        self.hits = self.misses = self.evictions = 0
+
+    def get(self, key):
+        """Returns the stored value for `key`, or None on a miss."""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key, value) -> None:
+        with self._lock:
+            if self.maxsize <= 0:
+                return
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            self._evict()
+
+    def resize(self, maxsize: int) -> None:
+        """Sets a new bound, evicting the least recently used entries if needed. 0 disables the cache."""
+        with self._lock:
+            self.maxsize = maxsize
+            self._evict()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def info(self) -> CacheInfo:
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.evictions, self.maxsize, len(self._entries))
+
+    def _evict(self) -> None:
+        while len(self._entries) > max(self.maxsize, 0):
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+
+def lru_cache(maxsize: int = DEFAULT_MAXSIZE) -> Callable:
+    """Memoizes a str -> str function. The wrapper exposes `cache_info()`,
+    `cache_clear()` and `cache_resize(maxsize)`; exceptions are never cached."""
+    def decorator(func: Callable[[str], str]) -> Callable[[str], str]:
+        cache = LRUCache(maxsize)
+
+        @functools.wraps(func)
+        def wrapper(word: str) -> str:
+            output = cache.get(word)
+            if output is None:
+                output = func(word)
+                cache.put(word, output)
+            return output
+
+        wrapper.cache_info = cache.info
+        wrapper.cache_clear = cache.clear
+        wrapper.cache_resize = cache.resize
+        return wrapper
+    return decorator
@@ -1,10 +1,20 @@
 """Simple Tester for Kazakh morphology generation that handles vowel & consonant harmonies.
 """
 
+import functools
+import pickle
+
 from absl.testing import absltest
+from pynini.lib import rewrite
+import KazakhBatch
 import KazakhMorphology
 
 
+def _cached_analyzers(word: str, stems) -> int:
+    KazakhMorphology.analyze(word, stems)
+    return len(KazakhMorphology._lexicon_analyzers)
+
+
 class KazakhMorphTest(absltest.TestCase):
     def assertMorph(self, input_word: str, expected: str):
         self.assertEqual(KazakhMorphology.inflect(input_word), expected)
@@ -96,7 +106,7 @@ class KazakhMorphTest(absltest.TestCase):
 
         # Test Concatenations
         self.assertMorph("bala+1SING-POSS+DAT", "balama")
-        self.assertMorph("kirpi+1PLR-POSS+DAT", "kirpimize")
+        self.assertMorph("kirpi+1PLR-POSS+DAT", "kirpimizge")
         self.assertMorph("sóz+2SING-POSS+DAT", "sózińe")
         self.assertMorph("bala+3-POSS+DAT", "balasyna")
         self.assertMorph("bala+3-POSS+LOC", "balasynda")
@@ -104,6 +114,114 @@ class KazakhMorphTest(absltest.TestCase):
         self.assertMorph("bala+3-POSS+ABL", "balasynan")
         self.assertMorph("kirpi+3-POSS+ABL", "kirpisinen")
 
+    def testCascadeMatchesFullMorph(self):
+        for word in ["bala+PLR+2PLR-POSS", "kirpi+3-POSS+ABL", "qazaqstan+ABL+INS", "shymkent+ACC", "qala"]:
+            self.assertEqual(rewrite.top_rewrite(word, KazakhMorphology.cascade(word)),
+                             rewrite.top_rewrite(word, KazakhMorphology.morph))
+        self.assertLess(KazakhMorphology.cascade("sóz+DAT").num_states(), KazakhMorphology.morph.num_states())
+
+    def testUntaggedUsesFullMorph(self):
+        self.assertIs(KazakhMorphology.cascade("qala"), KazakhMorphology.morph)
+        with self.assertRaises(Exception):
+            KazakhMorphology.inflect("che")
+
+    def testHarmonyFollowsLastVowel(self):
+        # Mixed-vowel stems harmonize with their last vowel, not with any front vowel before it
+        self.assertMorph("kitap+ACC", "kitapty")
+        self.assertMorph("kitapqana+LOC", "kitapqanada")
+        self.assertMorph("rábimyh+PLR+LOC", "rábimyhtarda")
+        self.assertMorph("mektep+ABL", "mektepten")
+
+    def testPossessiveDativeAfterConsonant(self):
+        # Singular and third-person possessives take -a/-e/-na, plural ones the plain dative
+        self.assertMorph("adam+3-POSS+DAT", "adamyna")
+        self.assertMorph("bala+PLR+1SING-POSS+DAT", "balalaryma")
+        self.assertMorph("sóz+2SING-POSS+DAT", "sózińe")
+        self.assertMorph("kirpi+PLR+1PLR-POSS+DAT", "kirpilerimizge")
+        self.assertMorph("bala+PLR+1PLR-POSS+DAT", "balalarymyzǵa")
+        # The same after vowel-final stems
+        self.assertMorph("bala+1PLR-POSS+DAT", "balamyzǵa")
+        self.assertMorph("bala+2PLR-POSS+DAT", "balańyzǵa")
+        self.assertMorph("kirpi+2PLR-POSS+DAT", "kirpińizge")
+        self.assertMorph("bala+1SING-POSS+DAT", "balama")
+        self.assertMorph("bala+3-POSS+DAT", "balasyna")
+
+    def testDefaultsFollowStemSegment(self):
+        # The default allomorphs only attach after a letter, never to a tag no rule rewrote
+        self.assertMorph("tart+GEN", "tarttyń")
+        for word in ["tart+PLR+GEN", "tart+1SING-POSS+ACC", "tart+1SING-POSS+LOC"]:
+            self.assertMorph(word, word)
+
+    def testParadigm(self):
+        table = KazakhMorphology.paradigm("mektep")
+        self.assertLen(table, 2 * 6 * 7)
+        self.assertEqual(table["mektep+PLR+1SING-POSS"], "mektepterim")
+        for word, surface in table.items():
+            self.assertEqual(surface, KazakhMorphology.inflect(word), word)
+        verbs = KazakhMorphology.paradigm("jazý", KazakhMorphology.VERBAL)
+        self.assertEqual(verbs["jazý+PAST-PTCP"], "jazǵan")
+        self.assertEqual(verbs["jazý+CAUSE+PASS"], "jazdyrylý")
+        self.assertEqual(verbs["jazý+PASS+PAST-PTCP"], "jazylǵan")
+        self.assertEqual(verbs["jazý+NEG+PAST-PTCP"], "jazbaǵan")
+        self.assertEqual(verbs["jazý+CAUSE+PRES-PTCP"], "jazdyratyn")
+        self.assertNotIn("jazý+PRES-PTCP+PAST-PTCP", verbs)
+        for word, surface in verbs.items():
+            self.assertEqual(surface, KazakhMorphology.inflect(word), word)
+        # Forms the grammar leaves tags in are not part of the paradigm
+        forms = KazakhMorphology.paradigm("tart")
+        self.assertNotIn("tart+DAT", forms)
+        self.assertTrue(all("+" not in surface for surface in forms.values()))
+
+    def testAnalyze(self):
+        surface = KazakhMorphology.inflect("bala+PLR+1PLR-POSS+DAT")
+        self.assertIn("bala+PLR+1PLR-POSS+DAT", KazakhMorphology.analyze(surface))
+        stems = KazakhMorphology.lexicon(["bala", "kitap"])
+        self.assertEqual(KazakhMorphology.analyze(surface, stems), ["bala+PLR+1PLR-POSS+DAT"])
+        self.assertEqual(KazakhMorphology.analyze("sózder", stems), [])
+        self.assertIs(KazakhMorphology.analyzer(stems), KazakhMorphology.analyzer(stems))
+        results = KazakhMorphology.analyze_many(["kitaptar", "balalar"], stems, processes=2, chunksize=1)
+        self.assertEqual([result.output for result in results], [["kitap+PLR"], ["bala+PLR"]])
+
+    def testLexiconAnalyzerCache(self):
+        stems = KazakhMorphology.lexicon(["bala", "kitap"])
+        words = ["kitaptar", "balalar"] * 8
+        results = KazakhMorphology.analyze_many(words, stems, processes=2, chunksize=2)
+        self.assertEqual([result.output for result in results], [["kitap+PLR"], ["bala+PLR"]] * 8)
+        # Each chunk unpickles its own copy of the lexicon; the copies share one cached analyzer.
+        KazakhMorphology._lexicon_analyzers.clear()
+        KazakhMorphology._last_lexicon = (None, None)
+        sizes = KazakhBatch.imap(functools.partial(_cached_analyzers, stems=stems), words, processes=2, chunksize=2)
+        self.assertEqual({result.output for result in sizes}, {1})
+        self.assertIs(KazakhMorphology.analyzer(pickle.loads(pickle.dumps(stems))), KazakhMorphology.analyzer(stems))
+        for stem in ["sóz", "qala", "mektep", "til", "kól"]:
+            KazakhMorphology.analyze("balalar", KazakhMorphology.lexicon([stem]))
+        self.assertLen(KazakhMorphology._lexicon_analyzers, KazakhMorphology._LEXICON_ANALYZERS)
+
+    def testInflectMany(self):
+        results = KazakhMorphology.inflect_many(["bala+PLR", "qala!", "sóz+DAT"], processes=2, chunksize=1)
+        self.assertEqual([result.output for result in results], ["balalar", None, "sózge"])
+        self.assertIsNotNone(results[1].error)
+
+    def testInflectBatch(self):
+        words = ["bala+PLR", "qala!", "sóz+DAT", "bala+PLR+1PLR-POSS+DAT", "bala+PLR", "kirpi+3-POSS+ABL"]
+        results = KazakhMorphology.inflect_batch(words, batch_size=4)
+        self.assertEqual([result.input for result in results], words)
+        for result in results:
+            if result.error is None:
+                self.assertEqual(result.output, KazakhMorphology.inflect(result.input))
+        self.assertIsNone(results[1].output)
+        self.assertEqual(results[1].position, 4)
+
+    def testCache(self):
+        KazakhMorphology.inflect.cache_clear()
+        self.addCleanup(KazakhMorphology.inflect.cache_resize, KazakhMorphology.inflect.cache_info().maxsize)
+        KazakhMorphology.inflect.cache_resize(2)
+        for word in ["bala+PLR", "bala+PLR", "sóz+DAT", "qala+ACC", "bala+PLR"]:
+            KazakhMorphology.inflect(word)
+        info = KazakhMorphology.inflect.cache_info()
+        self.assertEqual((info.hits, info.misses, info.evictions, info.currsize), (1, 4, 2, 2))
+        self.assertMorph("sóz+DAT", "sózge")
+
 
 if __name__ == '__main__':
     absltest.main()
@@ -0,0 +1,217 @@
+"""Rewrite rules for Kazakh morphology generation. Compiling this module builds every rule and
+composes the full cascade into `morph`; the public interface, along with the reference table for input tags, lives
+in KazakhMorphology, which loads the compiled machine from the on-disk cache.
+
+Vowel harmony is a stage of its own. The suffix rules only choose an allomorph by the consonant class of the
+segment right before the tag, and write the harmonizing vowels and velars as archiphonemes; `harmony`, the last
+group of the cascade, then resolves every archiphoneme by the class (front or back) of the last vowel before it.
+
+Reference:
+K. Gorman & R. Sproat. 2021. Finite-State Text Processing . Morgan & Claypool.
+"""
+
+import pynini as pn
+
+# Kazakh alphabet
+v = pn.union(
+    "a", "o", "u", "y",
+    "á", "e", "i", "o", "ó"
+)
+c = pn.union(
+    "ý", "b", "d", "f",
+    "g", "ǵ", "h", "ı",
+    "j", "k", "l", "m",
+    "n", "ń", "p", "q",
+    "r", "s", "t", "v",
+    "x", "z", "sh", "ch"
+)
+tag = pn.union(
+    "A", "B", "C", "D",
+    "E", "F", "G", "H",
+    "I", "J", "K", "L",
+    "M", "N", "O", "P",
+    "Q", "R", "S", "T",
+    "U", "V", "W", "X",
+    "Y", "Z", "+", "1",
+    "2", "3", "-", "^"
+)
+sigma_star = pn.union(v, c, tag).closure().optimize()
+
+# Archiphonemes written by the suffix rules (a/e, y/i, ǵ/g, q/k), resolved by `harmony` to the class of the last vowel
+A, I, G, K = "ä", "ï", "ğ", "ķ"
+sigma = pn.union(v, c, tag, A, I, G, K).closure().optimize()
+
+# Vowel classes -> used for vowel harmony
+v_front = pn.union(
+    "á", "e", "i", "ó", "ú", "[BOS]ı",
+    "áı", "eı", "iı", "óı", "úı"
+)
+v_back = pn.union(
+    "a", "o", "u", "y",
+    "aı", "oı", "uı", "yı"
+)
+# Either class, including the archiphoneme vowels of suffixes already attached
+vowel = pn.union(v_front, v_back, A, I)
+v_plain = pn.union(v, A, I)
+# Any letter: the default allomorphs attach after a stem or suffix segment, never right after another tag
+segment = pn.union(v_plain, c)
+# The last vowel is front; A, I, G and K written so far take its class
+transparent = pn.union(c, tag, A, I, G, K)
+front_state = pn.union("á", "e", "i", "ó", "ú", "[BOS]ı") + transparent.closure()
+# Consonant classes -> used for consonant harmony
+nasal = pn.union(
+    "m", "n", "ń"
+)
+liquid = pn.union(
+    "l", "ı", "ý"
+)
+vFric = pn.union(
+    "z", "j", "v"
+)
+liquid_vFric = pn.union(
+    "z", "j", "v", "r", "l", "ı", "ý"
+)
+sonorant_vFric = pn.union(
+    "v", "ı", "ý", "r",
+    "l", "m", "n", "ń",
+    "z", "j"
+)
+voiceless = pn.union(
+    # Note: List includes voiced consonants that would be devoiced in syllable-coda positions,
+    # notwithstanding voiced consonants almost never appear in word-final positions
+    "b", "p", "g", "k",
+    "f", "h", "d", "p",
+    "q", "s", "t", "x",
+    "sh", "ch"
+)
+
+
+'''Rules'''
+#
+# Plural
+plr1 = pn.cdrewrite(pn.cross("+PLR", f"l{A}r"), vowel, "", sigma).optimize()
+plr2 = pn.cdrewrite(pn.cross("+PLR", f"d{A}r"), vowel + sonorant_vFric, "", sigma).optimize()
+plr3 = pn.cdrewrite(pn.cross("+PLR", f"t{A}r"), vowel + voiceless, "", sigma).optimize()
+plural = plr1 @ plr2 @ plr3
+
+# Possessive
+poss1 = pn.cdrewrite(pn.cross("+3-POSS", f"s{I}^"), vowel, pn.union("+LOC", "+ABL"), sigma).optimize()
+poss2 = pn.cdrewrite(pn.cross("+3-POSS", f"{I}^"), vowel + c, pn.union("+LOC", "+ABL"), sigma).optimize()
+poss3 = pn.cdrewrite(pn.string_map([
+    ("+1SING-POSS", "m^"),
+    ("+2SING-POSS", "ń^"),
+    ]),
+    v_plain, "+DAT",
+    sigma).optimize()
+poss4 = pn.cdrewrite(pn.cross("+3-POSS", f"s{I}^"), vowel, "+DAT", sigma).optimize()
+poss5 = pn.cdrewrite(pn.string_map([
+    ("+1SING-POSS", f"{I}m^"),
+    ("+2SING-POSS", f"{I}ń^"),
+    ("+3-POSS", f"{I}^"),
+    ]),
+    vowel + c, "+DAT",
+    sigma).optimize()
+poss6 = pn.cdrewrite(pn.string_map([
+    ("+1SING-POSS", "m"),
+    ("+2SING-POSS", "ń"),
+    ]),
+    v_plain, "",
+    sigma).optimize()
+poss7 = pn.cdrewrite(pn.string_map([
+    ("+1PLR-POSS", f"m{I}z"),
+    ("+2PLR-POSS", f"ń{I}z"),
+    ("+3-POSS", f"s{I}"),
+    ]),
+    vowel, "",
+    sigma).optimize()
+poss8 = pn.cdrewrite(pn.string_map([
+    ("+1SING-POSS", f"{I}m"),
+    ("+1PLR-POSS", f"{I}m{I}z"),
+    ("+2SING-POSS", f"{I}ń"),
+    ("+2PLR-POSS", f"{I}ń{I}z"),
+    ("+3-POSS", f"{I}"),
+    ]),
+    vowel + c, "",
+    sigma).optimize()
+poss = poss1 @ poss2 @ poss3 @ poss4 @ poss5 @ poss6 @ poss7 @ poss8
+
+# Negative
+neg1 = pn.cdrewrite(pn.cross("ý+NEG", f"m{A}ý"), vowel | vowel + liquid, "", sigma).optimize()
+neg2 = pn.cdrewrite(pn.cross("ý+NEG", f"b{A}ý"), vowel + nasal | vowel + vFric, "", sigma).optimize()
+neg3 = pn.cdrewrite(pn.cross("ý+NEG", f"p{A}ý"), vowel + voiceless, "", sigma).optimize()
+neg = neg1 @ neg2 @ neg3
+
+# Causative
+cause1 = pn.cdrewrite(pn.cross("ý+CAUSE", "tý"), v_plain, "", sigma).optimize()
+cause2 = pn.cdrewrite(pn.cross("ý+CAUSE", f"t{I}rý"), vowel + voiceless, "", sigma).optimize()
+cause3 = pn.cdrewrite(pn.cross("ý+CAUSE", f"d{I}rý"), segment, "", sigma).optimize()
+cause = cause1 @ cause2 @ cause3
+
+# Passive
+pass1 = pn.cdrewrite(pn.cross("ý+PASS", f"{I}ný"), vowel + "l", "", sigma).optimize()
+pass2 = pn.cdrewrite(pn.cross("ý+PASS", f"{I}lý"), segment, "", sigma).optimize()
+passive = pass1 @ pass2
+
+'''Cases'''
+#
+# Accusative
+acc_poss = pn.cdrewrite(pn.cross("^+ACC", "n"), "", "[EOS]", sigma).optimize()
+acc1 = pn.cdrewrite(pn.cross("+ACC", f"t{I}"), voiceless, "", sigma).optimize()
+acc2 = pn.cdrewrite(pn.cross("+ACC", f"n{I}"), vowel, "", sigma).optimize()
+acc3 = pn.cdrewrite(pn.cross("+ACC", f"d{I}"), segment, "", sigma).optimize()
+acc = acc1 @ acc2 @ acc_poss @ acc3
+
+# Genitive
+gen1 = pn.cdrewrite(pn.cross("+GEN", f"n{I}ń"), vowel | vowel + nasal, "", sigma).optimize()
+gen2 = pn.cdrewrite(pn.cross("+GEN", f"d{I}ń"), vowel + liquid_vFric, "", sigma).optimize()
+gen3 = pn.cdrewrite(pn.cross("+GEN", f"t{I}ń"), segment, "", sigma).optimize()
+gen = gen1 @ gen2 @ gen3
+
+# Dative
+dat1 = pn.cdrewrite(pn.cross("^+DAT", f"n{A}"), vowel, "", sigma).optimize()
+dat2 = pn.cdrewrite(pn.cross("^+DAT", A), segment, "", sigma).optimize()
+dat3 = pn.cdrewrite(pn.cross("+DAT", f"{G}{A}"), vowel | vowel + sonorant_vFric, "", sigma).optimize()
+dat4 = pn.cdrewrite(pn.cross("+DAT", f"{K}{A}"), vowel + c, "", sigma).optimize()
+dat = dat1 @ dat2 @ dat3 @ dat4
+
+# Locative
+loc1 = pn.cdrewrite(pn.cross("^+LOC", f"nd{A}"), vowel, "", sigma).optimize()
+loc2 = pn.cdrewrite(pn.cross("+LOC", f"t{A}"), vowel + voiceless, "", sigma).optimize()
+loc3 = pn.cdrewrite(pn.cross("+LOC", f"d{A}"), segment, "", sigma).optimize()
+loc = loc1 @ loc2 @ loc3
+
+# Ablative
+abl1 = pn.cdrewrite(pn.cross("^+ABL", f"n{A}n"), vowel, "", sigma).optimize()
+abl2 = pn.cdrewrite(pn.cross("+ABL", f"d{A}n"), vowel | vowel + liquid_vFric, "", sigma).optimize()
+abl3 = pn.cdrewrite(pn.cross("+ABL", f"n{A}n"), vowel + nasal, "", sigma).optimize()
+abl4 = pn.cdrewrite(pn.cross("+ABL", f"t{A}n"), voiceless, "", sigma).optimize()
+abl = abl1 @ abl2 @ abl3 @ abl4
+
+# Instrumental
+ins1 = pn.cdrewrite(pn.cross("+INS", "men"), pn.union(v_plain, nasal, "l", "r"), "", sigma).optimize()
+ins2 = pn.cdrewrite(pn.cross("+INS", "ben"), pn.union("z", "j"), "", sigma).optimize()
+ins3 = pn.cdrewrite(pn.cross("+INS", "pen"), voiceless, "", sigma).optimize()
+ins = ins1 @ ins2 @ ins3
+
+'''Participles'''
+#
+# Present
+pres_ptcp1 = pn.cdrewrite(pn.cross("ý+PRES-PTCP", f"ı{A}t{I}n"), vowel, "", sigma).optimize()
+pres_ptcp2 = pn.cdrewrite(pn.cross("ý+PRES-PTCP", f"{A}t{I}n"), vowel + c, "", sigma).optimize()
+pres_ptcp = pres_ptcp1 @ pres_ptcp2
+
+# Past
+pst_ptcp1 = pn.cdrewrite(pn.cross("ý+PAST-PTCP", f"{G}{A}n"), vowel | vowel + sonorant_vFric, "", sigma).optimize()
+pst_ptcp2 = pn.cdrewrite(pn.cross("ý+PAST-PTCP", f"{K}{A}n"), vowel + voiceless, "", sigma).optimize()
+pst_ptcp = pst_ptcp1 @ pst_ptcp2
+
+'''Harmony'''
+#
+# Front after a front last vowel, back otherwise
+harmony1 = pn.cdrewrite(pn.string_map([(A, "e"), (I, "i"), (G, "g"), (K, "k")]), front_state, "", sigma).optimize()
+harmony2 = pn.cdrewrite(pn.string_map([(A, "a"), (I, "y"), (G, "ǵ"), (K, "q")]), "", "", sigma).optimize()
+harmony = harmony1 @ harmony2
+
+rules = plural @ poss @ neg @ cause @ passive @ acc @ dat @ gen @ loc @ abl @ ins @ pres_ptcp @ pst_ptcp @ harmony
+morph = pn.closure(sigma_star) @ rules @ pn.closure(sigma_star)
+morph.optimize()
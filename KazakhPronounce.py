@@ -0,0 +1,30 @@
+"""Pronunciation of inflected forms in one lookup: "bala+PLR+DAT" -> "balalaɾɣa".
+
+Equivalent to `KazakhG2P.to_phoneme(KazakhMorphology.inflect(word))`, but runs a
+single precompiled machine (see KazakhPronounceRules) instead of two compositions
+and a string round trip. Inputs are checked by `KazakhMorphology.validate` first, so
+they fail with the same errors and positions as `inflect`.
+"""
+
+from typing import Iterable, Optional
+
+from pynini.lib import rewrite
+
+import KazakhBatch
+import KazakhCache
+import KazakhMemo
+import KazakhMorphology
+
+fused = KazakhCache.load("KazakhPronounceRules", ["fused"])["fused"]
+
+
+@KazakhMemo.lru_cache()
+def pronounce_inflected(word: str) -> str:
+    return rewrite.top_rewrite(KazakhMorphology.validate(word), fused)
+
+
+def pronounce_inflected_many(words: Iterable[str], processes: Optional[int] = None,
+                             chunksize: int = 256) -> list[KazakhBatch.Result]:
+    """Runs `pronounce_inflected` over `words` on a pool of `processes` workers (all cores by default).
+    Results are in input order; failures are reported per word in `Result.error`."""
+    return list(KazakhBatch.imap(pronounce_inflected, words, processes, chunksize))
@@ -0,0 +1,20 @@
+"""Fused morphology-to-phonology cascade: a tagged lemma in, its pronunciation out.
+
+The two grammars use different symbol inventories. The morphology's alphabet (`v`,
+`c`, `tag`) includes the tag characters and the `^` possessive boundary, while the
+G2P input alphabet `grapheme` has neither. The morphology's output is therefore
+restricted to strings of graphemes before `g2p` is applied, so inflections that
+still carry a tag or a boundary have no path, exactly where `to_phoneme` would
+reject the output of `inflect`.
+
+Reference:
+K. Gorman & R. Sproat. 2021. Finite-State Text Processing . Morgan & Claypool.
+"""
+
+import pynini as pn
+
+from KazakhG2PRules import g2p, grapheme
+from KazakhMorphologyRules import morph
+
+fused = morph @ pn.closure(grapheme) @ g2p
+fused.optimize()
@@ -0,0 +1,35 @@
+"""Simple Tester for the fused morphology-to-phonology machine.
+"""
+
+from absl.testing import absltest
+import KazakhBench
+import KazakhG2P
+import KazakhMorphology
+import KazakhPronounce
+import KazakhValidate
+
+
+class KazakhPronounceTest(absltest.TestCase):
+    def testMatchesTwoStepPipeline(self):
+        for word in KazakhBench.synthetic_corpus(300) + ["bala+PLR+DAT", "qala+FOO", "che"]:
+            try:
+                expected = KazakhG2P.to_phoneme(KazakhMorphology.inflect(word))
+            except Exception:
+                with self.assertRaises(Exception):
+                    KazakhPronounce.pronounce_inflected(word)
+            else:
+                self.assertEqual(KazakhPronounce.pronounce_inflected(word), expected, word)
+
+    def testPronounceInflected(self):
+        self.assertEqual(KazakhPronounce.pronounce_inflected("qazaq+PLR"), "qχazaqtaɾ")
+
+    def testValidatesInput(self):
+        with self.assertRaises(KazakhValidate.UnknownTag) as raised:
+            KazakhPronounce.pronounce_inflected("qala+FOO")
+        self.assertEqual(raised.exception.position, 4)
+        with self.assertRaises(KazakhValidate.IllegalTagOrder):
+            KazakhPronounce.pronounce_inflected("bala+DAT+PLR")
+
+
+if __name__ == '__main__':
+    absltest.main()
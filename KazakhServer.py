@@ -0,0 +1,217 @@
+"""Local inference server for `inflect` and `to_phoneme`.
+
+    python -m KazakhServer [--socket PATH | --host 127.0.0.1 --port 8765]
+                           [--max-batch 64] [--max-wait-ms 2] [--processes N]
+                           [--backend pynini|tables]
+
+Clients speak one JSON object per line over a Unix socket or localhost TCP:
+
+    {"id": 1, "op": "inflect", "input": "bala+PLR"}   -> {"id": 1, "output": "balalar"}
+    {"id": 2, "op": "to_phoneme", "input": "bala+PLR"} -> {"id": 2, "error": "...", "position": 4}
+    {"op": "metrics"}                                  -> {"queue_depth": 0, "batches": ...}
+
+Requests may be pipelined; responses carry the request's id and can arrive out of
+order. Requests that arrive within `max_wait_ms` of each other are collected into a
+micro-batch of at most `max_batch` inputs and run on a pool of worker processes,
+each of which loads the grammars once. With `--backend tables` the workers map the
+shared KazakhTables files instead, so the machines are held in memory once.
+"""
+
+import argparse
+import asyncio
+import collections
+import concurrent.futures
+import functools
+import importlib
+import json
+import os
+import time
+from typing import Optional
+
+import KazakhBatch
+
+# op -> (module, function); resolved in the workers, so the server process never loads a grammar.
+OPS = {
+    "inflect": ("KazakhMorphology", "inflect"),
+    "to_phoneme": ("KazakhG2P", "to_phoneme"),
+}
+BACKENDS = {"pynini": OPS, "tables": {op: ("KazakhTables", name) for op, (_, name) in OPS.items()}}
+
+
+def _load_grammars(backend: str = "pynini") -> None:
+    for module, _ in BACKENDS[backend].values():
+        importlib.import_module(module)
+    if backend == "tables":
+        import KazakhTables
+
+        KazakhTables.machine("morph")
+        KazakhTables.machine("g2p")
+
+
+def _run_batch(op: str, words: list[str], backend: str = "pynini") -> list[KazakhBatch.Result]:
+    module, name = BACKENDS[backend][op]
+    func = getattr(importlib.import_module(module), name)
+    return [KazakhBatch.apply(func, word) for word in words]
+
+
+class Server:
+    def __init__(self, max_batch: int = 64, max_wait_ms: float = 2.0, processes: Optional[int] = None,
+                 backend: str = "pynini"):
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.processes = processes or os.cpu_count() or 1
+        self.backend = backend
+        if backend == "tables":
+            import KazakhTables
+
+            # Export stale tables once, here, instead of in every worker at the same time.
+            KazakhTables.prepare()
+        self.pool = concurrent.futures.ProcessPoolExecutor(self.processes, initializer=_load_grammars,
+                                                           initargs=(backend,))
+        self.queue = asyncio.Queue()
+        self.slots = asyncio.Semaphore(self.processes)
+        self.latencies_ms = collections.deque(maxlen=10000)
+        self.requests = self.batches = 0
+        self._servers = []
+        self._batcher = None
+        self._running = set()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8765, path: Optional[str] = None):
+        """Starts listening on Unix socket `path`, or on `host`:`port` when no path is given."""
+        if path:
+            server = await asyncio.start_unix_server(self._handle, path)
+        else:
+            server = await asyncio.start_server(self._handle, host, port)
+        self._servers.append(server)
+        if self._batcher is None:
+            self._batcher = asyncio.create_task(self._batch_loop())
+        return server
+
+    async def close(self) -> None:
+        for server in self._servers:
+            server.close()
+            await server.wait_closed()
+        if self._batcher is not None:
+            self._batcher.cancel()
+        self.pool.shutdown(cancel_futures=True)
+
+    def metrics(self) -> dict:
+        latencies = sorted(self.latencies_ms)
+
+        def percentile(q):
+            return latencies[min(len(latencies) - 1, int(q / 100 * len(latencies)))] if latencies else None
+
+        return {
+            "queue_depth": self.queue.qsize(),
+            "requests": self.requests,
+            "batches": self.batches,
+            "mean_batch_size": self.requests / self.batches if self.batches else None,
+            "latency_p50_ms": percentile(50),
+            "latency_p99_ms": percentile(99),
+        }
+
+    async def submit(self, op: str, word: str) -> KazakhBatch.Result:
+        if op not in OPS:
+            raise ValueError(f"unknown op {op!r}")
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((op, word, future, time.perf_counter()))
+        return await future
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        pending = set()
+        try:
+            while line := await reader.readline():
+                task = asyncio.create_task(self._respond(line, writer))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+            await asyncio.gather(*pending)
+        finally:
+            writer.close()
+
+    async def _respond(self, line: bytes, writer: asyncio.StreamWriter) -> None:
+        request = None
+        try:
+            request = json.loads(line)
+            if request.get("op") == "metrics":
+                response = self.metrics()
+            else:
+                result = await self.submit(request.get("op"), request["input"])
+                response = {"id": request.get("id")}
+                if result.error is None:
+                    response["output"] = result.output
+                else:
+                    response["error"] = result.error
+                    if result.position is not None:
+                        response["position"] = result.position
+        except (ValueError, KeyError, TypeError, AttributeError) as error:
+            response = {"id": request.get("id") if isinstance(request, dict) else None,
+                        "error": f"bad request: {error}"}
+        writer.write(json.dumps(response, ensure_ascii=False).encode() + b"\n")
+        await writer.drain()
+
+    async def _batch_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            await self.slots.acquire()
+            task = asyncio.create_task(self._run(batch))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _run(self, batch: list) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            self.batches += 1
+            by_op = collections.defaultdict(list)
+            for request in batch:
+                by_op[request[0]].append(request)
+            for op, requests in by_op.items():
+                words = [word for _, word, _, _ in requests]
+                try:
+                    run = functools.partial(_run_batch, op, words, self.backend)
+                    results = await loop.run_in_executor(self.pool, run)
+                except Exception as error:
+                    results = [KazakhBatch.Result(word, None, f"{type(error).__name__}: {error}") for word in words]
+                now = time.perf_counter()
+                for (_, _, future, received), result in zip(requests, results):
+                    self.requests += 1
+                    self.latencies_ms.append((now - received) * 1000)
+                    if not future.done():
+                        future.set_result(result)
+        finally:
+            self.slots.release()
+
+
+async def _main(args: argparse.Namespace) -> None:
+    server = Server(args.max_batch, args.max_wait_ms, args.processes or None, args.backend)
+    listener = await server.start(args.host, args.port, args.socket)
+    print(f"listening on {args.socket or f'{args.host}:{args.port}'}", flush=True)
+    try:
+        await listener.serve_forever()
+    finally:
+        await server.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve inflect and to_phoneme over a local socket.")
+    parser.add_argument("--socket", help="Unix socket path (default: TCP)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--max-batch", type=int, default=64, help="largest micro-batch")
+    parser.add_argument("--max-wait-ms", type=float, default=2.0, help="longest wait to fill a micro-batch")
+    parser.add_argument("--processes", type=int, default=0, help="worker processes (0: one per core)")
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default="pynini",
+                        help="tables: workers share memory-mapped transition tables")
+    try:
+        asyncio.run(_main(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
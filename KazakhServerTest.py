@@ -0,0 +1,49 @@
+"""Simple Tester for the micro-batching inference server.
+"""
+
+import asyncio
+import json
+
+from absl.testing import absltest
+import KazakhServer
+
+
+class KazakhServerTest(absltest.TestCase):
+    async def exchange(self, requests: list[dict]) -> tuple[list[dict], dict]:
+        server = KazakhServer.Server(max_batch=8, max_wait_ms=20, processes=1)
+        listener = await server.start(port=0)
+        port = listener.sockets[0].getsockname()[1]
+        try:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            for request in requests:
+                writer.write(json.dumps(request).encode() + b"\n")
+            await writer.drain()
+            responses = [json.loads(await reader.readline()) for _ in requests]
+            writer.write(b'{"op": "metrics"}\n')
+            metrics = json.loads(await reader.readline())
+            writer.close()
+        finally:
+            await server.close()
+        return responses, metrics
+
+    def testMicroBatching(self):
+        requests = [{"id": 1, "op": "inflect", "input": "bala+PLR"},
+                    {"id": 2, "op": "to_phoneme", "input": "qazaqstan"},
+                    {"id": 3, "op": "inflect", "input": "qala!"},
+                    {"id": 4, "op": "inflect", "input": "sóz+DAT"},
+                    {"id": 5, "op": "unknown", "input": "bala"}]
+        responses, metrics = asyncio.run(self.exchange(requests))
+        by_id = {response["id"]: response for response in responses}
+        self.assertEqual(by_id[1]["output"], "balalar")
+        self.assertEqual(by_id[2]["output"], "qχazaqstan")
+        self.assertStartsWith(by_id[3]["error"], "UnknownSymbol")
+        self.assertEqual(by_id[3]["position"], 4)
+        self.assertEqual(by_id[4]["output"], "sózge")
+        self.assertIn("bad request", by_id[5]["error"])
+        self.assertEqual(metrics["requests"], 4)
+        self.assertLess(metrics["batches"], 4)
+        self.assertEqual(metrics["queue_depth"], 0)
+
+
+if __name__ == '__main__':
+    absltest.main()
@@ -0,0 +1,284 @@
+"""Array-backed transition tables for serving without Pynini.
+
+`export` flattens a compiled machine into CSR-style tables: for every state the
+offset of its first arc, and for every arc its input label, output label, target
+state and weight, plus one final weight per state (infinity for non-final states).
+Arcs are sorted by input label so a state's matching arcs are found by bisection.
+The machines are compiled with the byte token type, so labels are UTF-8 byte values
+(0 is epsilon), the symbol map is the identity over bytes and each label fits in a
+single byte. Weights are only stored when some arc has a non-zero weight. That
+comes to 9 bytes per arc, against 16 or more in an OpenFst const or vector FST.
+
+`Transducer` maps such a file into memory read-only and runs the same search as
+`rewrite.top_rewrite`: the shortest path through the composition of the input with
+the machine, explored with Dijkstra's algorithm over (input position, state) pairs.
+It needs only the standard library, so the serving side does not install OpenFst,
+and every process that maps the same file shares its physical pages. The table also
+carries the alphabet and tag slots of the grammar's KazakhValidate.Validator, so
+`inflect` and `to_phoneme` reject bad input with the same UnknownSymbol, UnknownTag
+and IllegalTagOrder errors (and positions) as the Pynini backend.
+`inflect` and `to_phoneme` serve from the tables in KAZAKH_FST_TABLES (default
+~/.cache/kazakh-fst/tables). Each table records the KazakhCache fingerprint of the
+grammar it was exported from, and a table that is missing, in an older format or
+built from an older grammar is exported again before it is mapped. Where Pynini is
+not installed the fingerprint cannot be computed and the tables are served as they
+are. `prepare` runs that check once; the CLI, server and benchmark call it before
+starting workers, so the workers neither repeat it nor race to export.
+
+    python -m KazakhTables [DIR]    # writes DIR/morph.kzfst and DIR/g2p.kzfst
+
+File layout (little-endian; uint32/float32 sections come first, so all are aligned):
+    magic b"KZFT", version, num_states, num_arcs, start, flags,
+    validator_size                                             7 x uint32
+    fingerprint                                                16 ASCII bytes
+    offsets[num_states + 1], nextstates[num_arcs]              uint32
+    finals[num_states], weights[num_arcs] (if flags & WEIGHTED) float32
+    ilabels[num_arcs], olabels[num_arcs]                       uint8
+    validator {"symbols": [...], "slots": [[...], ...]}        validator_size bytes of JSON
+"""
+
+import argparse
+import array
+import bisect
+import heapq
+import json
+import math
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from typing import Iterable, Optional
+
+import KazakhMemo
+import KazakhValidate
+
+MAGIC = b"KZFT"
+VERSION = 4
+WEIGHTED = 1
+_HEADER = struct.Struct("<4sIIIiII16s")
+
+TABLES_DIR = os.environ.get("KAZAKH_FST_TABLES",
+                            os.path.join(os.path.expanduser("~"), ".cache", "kazakh-fst", "tables"))
+# The rule module behind each table, whose KazakhCache fingerprint the table records.
+RULES = {"morph": "KazakhMorphologyRules", "g2p": "KazakhG2PRules"}
+# Set by `prepare` to the directory it checked, so worker processes started afterwards skip the check.
+_PREPARED = "KAZAKH_FST_TABLES_PREPARED"
+
+_machines = {}
+
+
+class Error(Exception):
+    """Raised when the input has no path through the machine."""
+
+
+def export(fst, path: str, fingerprint: str = "",
+           validator: Optional[KazakhValidate.Validator] = None) -> None:
+    """Writes Pynini machine `fst` to `path` in the table format above, recording the
+    `fingerprint` of the grammar it was built from and the input `validator`, if any."""
+    fst = fst.copy().arcsort("ilabel")
+    offsets, nextstates = array.array("I"), array.array("I")
+    ilabels, olabels = array.array("B"), array.array("B")
+    weights, finals = array.array("f"), array.array("f")
+    for state in range(fst.num_states()):
+        offsets.append(len(ilabels))
+        for arc in fst.arcs(state):
+            if arc.ilabel > 255 or arc.olabel > 255:
+                raise ValueError("only machines over byte labels can be exported")
+            ilabels.append(arc.ilabel)
+            olabels.append(arc.olabel)
+            nextstates.append(arc.nextstate)
+            weights.append(float(str(arc.weight)))
+        finals.append(float(str(fst.final(state))))
+    offsets.append(len(ilabels))
+    flags = WEIGHTED if any(weights) else 0
+    checks = b"" if validator is None else json.dumps(
+        {"symbols": sorted(validator.symbols), "slots": validator.slots}, ensure_ascii=False).encode("utf-8")
+    sections = [offsets, nextstates, finals] + ([weights] if flags & WEIGHTED else []) + [ilabels, olabels]
+    # A private temporary file, so concurrent exports to the same path never write into each other's file.
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            out.write(_HEADER.pack(MAGIC, VERSION, fst.num_states(), len(ilabels), fst.start(), flags,
+                                   len(checks), fingerprint.encode("ascii")))
+            for table in sections:
+                if sys.byteorder != "little":
+                    table.byteswap()
+                out.write(table.tobytes())
+            out.write(checks)
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        os.remove(tmp)
+        raise
+
+
+class Transducer:
+    """A read-only machine mapped from a table file. The pages are shared by every
+    process that maps the same file."""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as table:
+            self._map = mmap.mmap(table.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version = struct.unpack_from("<4sI", self._map)
+        if magic != MAGIC or version != VERSION:
+            raise Error(f"{path} is not a version {VERSION} transition table")
+        _, _, num_states, num_arcs, self.start, flags, checks, fingerprint = _HEADER.unpack_from(self._map)
+        self.fingerprint = fingerprint.decode("ascii").rstrip("\0")
+        if sys.byteorder != "little":
+            raise Error("transition tables are little-endian")
+        view = memoryview(self._map)
+        position = _HEADER.size
+
+        def section(typecode, count):
+            nonlocal position
+            size = count * array.array(typecode).itemsize
+            table = view[position:position + size].cast(typecode)
+            position += size
+            return table
+
+        self.offsets = section("I", num_states + 1)
+        self.nextstates = section("I", num_arcs)
+        self.finals = section("f", num_states)
+        self.weights = section("f", num_arcs) if flags & WEIGHTED else _Zeros()
+        self.ilabels = section("B", num_arcs)
+        self.olabels = section("B", num_arcs)
+        # Tables exported without a validator accept any input, like `__call__` itself.
+        self.validate = _accept
+        if checks:
+            spec = json.loads(bytes(view[position:position + checks]).decode("utf-8"))
+            self.validate = KazakhValidate.Validator(spec["symbols"], spec["slots"])
+
+    def num_states(self) -> int:
+        return len(self.finals)
+
+    def __call__(self, word: str) -> str:
+        """Returns the output of the cheapest path for `word`, like rewrite.top_rewrite."""
+        labels = word.encode("utf-8")
+        end = len(labels)
+        start = (0, self.start)
+        back = {start: None}
+        costs = {start: 0.0}
+        heap = [(0.0, 0, self.start)]
+        done = set()
+        while heap:
+            cost, position, state = heapq.heappop(heap)
+            node = (position, state)
+            if node in done:
+                continue
+            done.add(node)
+            if state < 0:
+                return self._output(back, node)
+            first, last = self.offsets[state], self.offsets[state + 1]
+            # Epsilon arcs sort first; arcs matching the next byte are found by bisection.
+            arcs = range(first, bisect.bisect_right(self.ilabels, 0, first, last))
+            if position < end:
+                low = bisect.bisect_left(self.ilabels, labels[position], first, last)
+                high = bisect.bisect_right(self.ilabels, labels[position], low, last)
+                arcs = list(arcs) + list(range(low, high))
+            for arc in arcs:
+                following = (position + (self.ilabels[arc] != 0), self.nextstates[arc])
+                self._relax(heap, costs, back, node, following, cost + self.weights[arc], self.olabels[arc])
+            if position == end and not math.isinf(self.finals[state]):
+                self._relax(heap, costs, back, node, (end, -1), cost + self.finals[state], 0)
+        raise Error("Composition failure")
+
+    @staticmethod
+    def _relax(heap, costs, back, node, following, cost, olabel) -> None:
+        if cost < costs.get(following, math.inf):
+            costs[following] = cost
+            back[following] = (node, olabel)
+            heapq.heappush(heap, (cost, following[0], following[1]))
+
+    @staticmethod
+    def _output(back, node) -> str:
+        output = bytearray()
+        while back[node] is not None:
+            node, olabel = back[node]
+            if olabel:
+                output.append(olabel)
+        output.reverse()
+        return output.decode("utf-8")
+
+
+def _accept(word: str) -> str:
+    return word
+
+
+class _Zeros:
+    """Stands in for the weights of an unweighted table."""
+
+    def __getitem__(self, arc: int) -> float:
+        return 0.0
+
+
+def machine(name: str) -> Transducer:
+    """Maps TABLES_DIR/`name`.kzfst ("morph" or "g2p"), exporting it first if it is missing or stale."""
+    if name not in _machines:
+        if os.environ.get(_PREPARED) != TABLES_DIR:
+            prepare(TABLES_DIR)
+        _machines[name] = Transducer(os.path.join(TABLES_DIR, name + ".kzfst"))
+    return _machines[name]
+
+
+def fingerprint(name: str) -> Optional[str]:
+    """Returns the KazakhCache fingerprint of the grammar behind table `name`, or None
+    when Pynini is not installed."""
+    try:
+        import KazakhCache
+    except ImportError:
+        return None
+    return KazakhCache.fingerprint(RULES[name], [name])
+
+
+def stale(directory: str, name: str) -> bool:
+    """Whether `directory`/`name`.kzfst is missing, in another format or exported from
+    another grammar than the current one."""
+    try:
+        with open(os.path.join(directory, name + ".kzfst"), "rb") as table:
+            magic, version, *_, recorded = _HEADER.unpack(table.read(_HEADER.size))
+    except (OSError, struct.error):
+        return True
+    if magic != MAGIC or version != VERSION:
+        return True
+    current = fingerprint(name)
+    return current is not None and recorded.decode("ascii").rstrip("\0") != current
+
+
+def prepare(directory: str = TABLES_DIR) -> None:
+    """Exports the stale tables in `directory` again. Call it once before starting worker
+    processes that map them; they inherit the environment and skip the check."""
+    names = [name for name in RULES if stale(directory, name)]
+    if names:
+        export_all(directory, names)
+    os.environ[_PREPARED] = directory
+
+
+def export_all(directory: str, names: Iterable[str] = tuple(RULES)) -> None:
+    """Writes the tables `names` ("morph", "g2p") to `directory`. This step needs Pynini."""
+    import KazakhG2P
+    import KazakhMorphology
+
+    grammars = {"morph": KazakhMorphology, "g2p": KazakhG2P}
+    os.makedirs(directory, exist_ok=True)
+    for name in names:
+        export(getattr(grammars[name], name), os.path.join(directory, name + ".kzfst"), fingerprint(name),
+               grammars[name].validate)
+
+
+@KazakhMemo.lru_cache()
+def inflect(word: str) -> str:
+    morph = machine("morph")
+    return morph(morph.validate(word))
+
+
+@KazakhMemo.lru_cache()
+def to_phoneme(word: str) -> str:
+    g2p = machine("g2p")
+    return g2p(g2p.validate(word))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export the compiled machines as transition tables.")
+    parser.add_argument("directory", nargs="?", default=TABLES_DIR)
+    export_all(parser.parse_args().directory)
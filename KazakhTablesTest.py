@@ -0,0 +1,86 @@
+"""Simple Tester for the array-backed transition tables.
+"""
+
+import os
+import tempfile
+import threading
+
+from absl.testing import absltest
+import KazakhBench
+import KazakhG2P
+import KazakhMorphology
+import KazakhTables
+import KazakhValidate
+
+
+class KazakhTablesTest(absltest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        directory = absltest.get_default_test_tmpdir()
+        KazakhTables.export(KazakhMorphology.morph, os.path.join(directory, "morph.kzfst"),
+                            validator=KazakhMorphology.validate)
+        KazakhTables.export(KazakhG2P.g2p, os.path.join(directory, "g2p.kzfst"), validator=KazakhG2P.validate)
+        cls.morph = KazakhTables.Transducer(os.path.join(directory, "morph.kzfst"))
+        cls.g2p = KazakhTables.Transducer(os.path.join(directory, "g2p.kzfst"))
+
+    def assertSame(self, func, table, word: str):
+        try:
+            expected = func(word)
+        except Exception:
+            with self.assertRaises(KazakhTables.Error):
+                table(word)
+        else:
+            self.assertEqual(table(word), expected, word)
+
+    def testMatchesPynini(self):
+        for word in KazakhBench.synthetic_corpus(300) + ["bala+3-POSS+ABL", "che", "qala!"]:
+            self.assertSame(KazakhMorphology.inflect, self.morph, word)
+        for word in ["qazaqstan", "kitap", "osylaı", "balalar", "bala+PLR"]:
+            self.assertSame(KazakhG2P.to_phoneme, self.g2p, word)
+
+    def testNumStates(self):
+        self.assertEqual(self.morph.num_states(), KazakhMorphology.morph.num_states())
+
+    def testValidatesLikePynini(self):
+        for word in ["qala!", "bala+FOO", "bala+DAT+PLR", "bala+PLR"]:
+            expected = KazakhMorphology.validate.check(word)
+            found = self.morph.validate.check(word)
+            self.assertEqual((type(found), getattr(found, "position", None)),
+                             (type(expected), getattr(expected, "position", None)), word)
+        with self.assertRaises(KazakhValidate.UnknownSymbol):
+            self.g2p.validate("bala+PLR")
+
+    def testStaleTablesAreExportedAgain(self):
+        directory = tempfile.mkdtemp()
+        path = os.path.join(directory, "morph.kzfst")
+        KazakhTables.export(KazakhMorphology.morph, path, "0" * 16)
+        with open(os.path.join(directory, "g2p.kzfst"), "wb") as table:
+            table.write(b"KZFT\x02\x00\x00\x00")
+        self.assertTrue(KazakhTables.stale(directory, "morph"))
+        self.assertTrue(KazakhTables.stale(directory, "g2p"))
+        self.enter_context(absltest.mock.patch.object(KazakhTables, "TABLES_DIR", directory))
+        self.enter_context(absltest.mock.patch.object(KazakhTables, "_machines", {}))
+        self.enter_context(absltest.mock.patch.dict(os.environ))
+        morph = KazakhTables.machine("morph")
+        self.assertEqual(morph.fingerprint, KazakhTables.fingerprint("morph"))
+        self.assertFalse(KazakhTables.stale(directory, "g2p"))
+        self.assertEqual(morph("bala+PLR"), "balalar")
+        with self.assertRaises(KazakhValidate.UnknownSymbol) as raised:
+            KazakhTables.inflect("qala!")
+        self.assertEqual(raised.exception.position, 4)
+
+    def testConcurrentExports(self):
+        path = os.path.join(tempfile.mkdtemp(), "g2p.kzfst")
+        threads = [threading.Thread(target=KazakhTables.export, args=(KazakhG2P.g2p, path, "f" * 16))
+                   for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(os.listdir(os.path.dirname(path)), ["g2p.kzfst"])
+        self.assertEqual(KazakhTables.Transducer(path)("kitap"), KazakhG2P.to_phoneme("kitap"))
+
+
+if __name__ == '__main__':
+    absltest.main()
@@ -0,0 +1,126 @@
+"""Rule-level tracing and profiling of the rewrite cascades.
+
+`trace` applies a cascade one rule at a time, in the order of its `rules`
+composition (see KazakhBuild.cascade), and records the string after every rule,
+whether the rule changed it and how long it took. `Profiler` runs `trace` over a
+batch and aggregates how often each rule fired and the time spent per rule and
+group, which shows where a workload actually spends its time.
+
+    python -m KazakhTrace [--grammar g2p] WORD ...
+    python -m KazakhTrace [--grammar g2p] --profile FILE
+
+The individual rules come from the on-disk cache, so only the first trace of a
+grammar pays for compiling them.
+"""
+
+import argparse
+import collections
+import sys
+import time
+from typing import Iterable, NamedTuple, Optional
+
+from pynini.lib import rewrite
+
+import KazakhBuild
+import KazakhCache
+
+GRAMMARS = {"morph": "KazakhMorphologyRules", "g2p": "KazakhG2PRules"}
+
+_cascades = {}
+
+
+class Step(NamedTuple):
+    group: str
+    rule: str
+    output: Optional[str]  # None when the rule rejected its input.
+    changed: bool
+    seconds: float
+
+
+def rules(grammar: str) -> list[tuple[str, list[tuple[str, object]]]]:
+    """The cascade of `grammar` ("morph" or "g2p") as (group, [(rule, fst), ...]) in order."""
+    if grammar not in _cascades:
+        module = GRAMMARS[grammar]
+        groups = KazakhBuild.cascade(module)
+        fsts = KazakhCache.load(module, [rule for _, members in groups for rule in members])
+        _cascades[grammar] = [(group, [(rule, fsts[rule]) for rule in members]) for group, members in groups]
+    return _cascades[grammar]
+
+
+def trace(word: str, grammar: str = "morph") -> list[Step]:
+    """Applies every rule of `grammar` to `word` in turn. The last step's output is the
+    cascade's output; tracing stops at the first rule that rejects its input."""
+    steps = []
+    current = word
+    for group, members in rules(grammar):
+        for rule, fst in members:
+            start = time.perf_counter()
+            try:
+                output = rewrite.top_rewrite(current, fst)
+            except rewrite.Error:
+                steps.append(Step(group, rule, None, True, time.perf_counter() - start))
+                return steps
+            steps.append(Step(group, rule, output, output != current, time.perf_counter() - start))
+            current = output
+    return steps
+
+
+def format_trace(word: str, steps: list[Step], changed_only: bool = True) -> str:
+    lines = [word]
+    for step in steps:
+        if step.changed or not changed_only:
+            output = "<rejected>" if step.output is None else step.output
+            lines.append(f"  {step.group:<10} {step.rule:<12} {step.seconds * 1000:8.3f} ms  {output}")
+    lines.append(f"  {'total':<23} {sum(step.seconds for step in steps) * 1000:8.3f} ms")
+    return "\n".join(lines)
+
+
+class Profiler:
+    """Aggregates traces over many words: rule firing counts and time per rule and group."""
+
+    def __init__(self, grammar: str = "morph"):
+        self.grammar = grammar
+        self.words = 0
+        self.rejected = 0
+        self.fired = collections.Counter()
+        self.rule_seconds = collections.Counter()
+        self.group_seconds = collections.Counter()
+
+    def run(self, words: Iterable[str]) -> None:
+        for word in words:
+            self.words += 1
+            for step in trace(word, self.grammar):
+                self.rule_seconds[step.rule] += step.seconds
+                self.group_seconds[step.group] += step.seconds
+                if step.output is None:
+                    self.rejected += 1
+                elif step.changed:
+                    self.fired[step.rule] += 1
+
+    def report(self) -> str:
+        lines = [f"{self.words} words, {self.rejected} rejected", "",
+                 f"{'group':<12} {'seconds':>9} {'fired':>7}"]
+        for group, members in rules(self.grammar):
+            fired = sum(self.fired[rule] for rule, _ in members)
+            lines.append(f"{group:<12} {self.group_seconds[group]:>9.4f} {fired:>7}")
+        lines += ["", f"{'rule':<12} {'seconds':>9} {'fired':>7}"]
+        for rule, seconds in self.rule_seconds.most_common():
+            lines.append(f"{rule:<12} {seconds:>9.4f} {self.fired[rule]:>7}")
+        return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Trace or profile the rewrite cascades rule by rule.")
+    parser.add_argument("words", nargs="*")
+    parser.add_argument("--grammar", choices=sorted(GRAMMARS), default="morph")
+    parser.add_argument("--profile", help="file with one word per line to profile instead of tracing")
+    parser.add_argument("--all", action="store_true", help="also list rules that left the string unchanged")
+    args = parser.parse_args()
+    if args.profile:
+        profiler = Profiler(args.grammar)
+        with open(args.profile, encoding="utf-8") as lines:
+            profiler.run(line.rstrip("\r\n") for line in lines)
+        print(profiler.report())
+    else:
+        for word in args.words or (line.rstrip("\r\n") for line in sys.stdin):
+            print(format_trace(word, trace(word, args.grammar), changed_only=not args.all))
@@ -0,0 +1,35 @@
+"""Simple Tester for rule-level tracing and profiling.
+"""
+
+from absl.testing import absltest
+import KazakhG2P
+import KazakhMorphology
+import KazakhTrace
+
+
+class KazakhTraceTest(absltest.TestCase):
+    def testTraceMatchesCascade(self):
+        for word in ["bala+PLR+3-POSS+LOC", "shymkent+ACC", "qazaqstan+ABL+INS", "kirpi+1PLR-POSS+DAT"]:
+            steps = KazakhTrace.trace(word)
+            self.assertEqual(steps[-1].output, KazakhMorphology.inflect(word))
+        steps = KazakhTrace.trace("qazaqstan", "g2p")
+        self.assertEqual(steps[-1].output, KazakhG2P.to_phoneme("qazaqstan"))
+        self.assertEqual([step.rule for step in steps if step.changed], ["r4"])
+
+    def testRejection(self):
+        steps = KazakhTrace.trace("qala!")
+        self.assertLen(steps, 1)
+        self.assertIsNone(steps[0].output)
+
+    def testProfiler(self):
+        profiler = KazakhTrace.Profiler()
+        profiler.run(["bala+PLR", "sóz+PLR", "qala!"])
+        self.assertEqual(profiler.words, 3)
+        self.assertEqual(profiler.rejected, 1)
+        self.assertEqual(profiler.fired["plr1"], 1)
+        self.assertEqual(profiler.fired["plr2"], 1)
+        self.assertIn("plural", profiler.report())
+
+
+if __name__ == '__main__':
+    absltest.main()
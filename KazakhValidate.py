@@ -0,0 +1,88 @@
+"""Input validation that runs before any composition.
+
+A `Validator` is built once from a grammar's alphabet and, for the morphology, its
+tags grouped into slots in cascade order. It scans a word left to right, matching
+the longest known symbol at each position and reading each tag up to the next "+",
+so checking a word takes time linear in its length. The first problem found is
+raised as one of the InvalidInput subclasses below, which carry the position (in
+characters) where the offending text starts:
+
+    UnknownSymbol    a character that is not part of any letter of the alphabet
+    UnknownTag       a "+" tag the grammar does not define
+    IllegalTagOrder  a tag whose slot does not come after the previous tag's slot
+
+Without this check such inputs either fail deep inside the cascade with a generic
+composition failure or come out with tags left in the output.
+"""
+
+from typing import Iterable, Optional, Sequence
+
+TAG_MARK = "+"
+
+
+class InvalidInput(ValueError):
+    kind = "invalid input"
+
+    def __init__(self, word: str, position: int, text: str):
+        super().__init__(word, position, text)
+        self.word = word
+        self.position = position
+        self.text = text
+
+    def __str__(self) -> str:
+        return f"{self.kind} {self.text!r} at position {self.position} in {self.word!r}"
+
+
+class UnknownSymbol(InvalidInput):
+    kind = "unknown symbol"
+
+
+class UnknownTag(InvalidInput):
+    kind = "unknown tag"
+
+
+class IllegalTagOrder(InvalidInput):
+    kind = "illegal tag order"
+
+
+class Validator:
+    """Checks words against `symbols` (the letters, possibly several characters long,
+    such as "sh") followed by tags from `slots`. Each slot is a group of tags; a word
+    takes at most one tag per slot, and in slot order."""
+
+    def __init__(self, symbols: Iterable[str], slots: Sequence[Iterable[str]] = ()):
+        self.symbols = set(symbols)
+        self.slots = [list(tags) for tags in slots]
+        self._lengths = sorted({len(symbol) for symbol in self.symbols}, reverse=True)
+        self._slots = {tag: slot for slot, tags in enumerate(self.slots) for tag in tags}
+
+    def __call__(self, word: str) -> str:
+        """Returns `word` unchanged if it is valid and raises InvalidInput otherwise."""
+        error = self.check(word)
+        if error is not None:
+            raise error
+        return word
+
+    def check(self, word: str) -> Optional[InvalidInput]:
+        """Returns the first problem with `word`, or None if there is none."""
+        position = 0
+        previous = -1
+        while position < len(word):
+            if self._slots and word.startswith(TAG_MARK, position):
+                end = word.find(TAG_MARK, position + 1)
+                end = len(word) if end < 0 else end
+                tag = word[position:end]
+                slot = self._slots.get(tag)
+                if slot is None:
+                    return UnknownTag(word, position, tag)
+                if slot <= previous:
+                    return IllegalTagOrder(word, position, tag)
+                previous = slot
+                position = end
+            else:
+                length = next((length for length in self._lengths
+                               if word[position:position + length] in self.symbols), 0)
+                if not length:
+                    return UnknownSymbol(word, position, word[position])
+                position += length
+        return None
@@ -0,0 +1,39 @@
+"""Simple Tester for input validation.
+"""
+
+from absl.testing import absltest
+import KazakhG2P
+import KazakhMorphology
+import KazakhValidate
+
+
+class KazakhValidateTest(absltest.TestCase):
+    def assertInvalid(self, func, word: str, error: type, position: int):
+        with self.assertRaises(error) as raised:
+            func(word)
+        self.assertEqual(raised.exception.position, position)
+
+    def testMorphology(self):
+        self.assertEqual(KazakhMorphology.validate("qazaqstan+ABL+INS"), "qazaqstan+ABL+INS")
+        self.assertInvalid(KazakhMorphology.inflect, "Bala+PLR", KazakhValidate.UnknownSymbol, 0)
+        self.assertInvalid(KazakhMorphology.inflect, "qala!", KazakhValidate.UnknownSymbol, 4)
+        self.assertInvalid(KazakhMorphology.inflect, "bala+FOO", KazakhValidate.UnknownTag, 4)
+        self.assertInvalid(KazakhMorphology.inflect, "bala+PLR+plr", KazakhValidate.UnknownTag, 8)
+        self.assertInvalid(KazakhMorphology.inflect, "bala+DAT+PLR", KazakhValidate.IllegalTagOrder, 8)
+        self.assertInvalid(KazakhMorphology.inflect, "bala+3-POSS+1SING-POSS", KazakhValidate.IllegalTagOrder, 11)
+
+    def testGraphemes(self):
+        self.assertEqual(KazakhG2P.validate("sheker"), "sheker")
+        # "c" only occurs in "ch".
+        self.assertInvalid(KazakhG2P.to_phoneme, "cay", KazakhValidate.UnknownSymbol, 0)
+        self.assertInvalid(KazakhG2P.to_phoneme, "bala+PLR", KazakhValidate.UnknownSymbol, 4)
+
+    def testBatchKeepsGoing(self):
+        results = KazakhMorphology.inflect_many(["bala+PLR", "bala+FOO", "sóz+DAT"], processes=1)
+        self.assertEqual([result.output for result in results], ["balalar", None, "sózge"])
+        self.assertStartsWith(results[1].error, "UnknownTag")
+        self.assertEqual(results[1].position, 4)
+
+
+if __name__ == '__main__':
+    absltest.main()